@@ -0,0 +1,167 @@
+from enum import Enum
+
+
+class AlertState(Enum):
+    IDLE = "idle"
+    WARNING = "warning"
+    ALARM = "alarm"
+    COOLDOWN = "cooldown"
+
+
+class TrackAlert:
+    __slots__ = ("state", "hits", "misses", "cooldown_left", "hazard", "start_frame", "last_frame",
+                 "danger_frames", "min_ttc", "severity", "last")
+
+    def __init__(self):
+        self.state = AlertState.IDLE
+        self.hits = 0
+        self.misses = 0
+        self.cooldown_left = 0
+        self.hazard = None
+        self.start_frame = None
+        self.last_frame = None
+        self.danger_frames = 0
+        self.min_ttc = None
+        self.severity = None
+        self.last = None
+
+
+class AlertManager:
+    """
+    Per-track alert state machine with hysteresis.
+
+        idle -> warning     first dangerous frame
+        warning -> alarm    `enter_frames` dangerous frames before
+                            `exit_frames` consecutive safe ones   (start)
+        alarm -> cooldown   `exit_frames` consecutive safe frames
+        cooldown -> alarm   `enter_frames` dangerous frames again (update)
+        cooldown -> idle    `cooldown_frames` frames without that  (end)
+
+    A hazard therefore produces one "start", one "end" and "update" events
+    only when it escalates (more severe zone, or TTC down by `ttc_step`
+    seconds) or comes back during cooldown. Tracks that disappear while
+    alarmed end their hazard with `lost` set.
+    """
+
+    def __init__(self, enter_frames=2, exit_frames=5, cooldown_frames=15, ttc_step=0.5):
+        self.enter_frames = max(1, enter_frames)
+        self.exit_frames = max(1, exit_frames)
+        self.cooldown_frames = max(0, cooldown_frames)
+        self.ttc_step = ttc_step
+        self.tracks = {}
+        self._next_hazard = 1
+        self.counts = {"start": 0, "update": 0, "end": 0, "danger_frames": 0}
+
+    def _event(self, kind, frame_no, alert, lost=False):
+        a = alert.last
+        self.counts[kind] += 1
+        return {
+            "type": kind, "hazard": alert.hazard, "frame": frame_no, "id": a.track_id, "class": a.cls_name,
+            "start_frame": alert.start_frame, "duration_frames": alert.last_frame - alert.start_frame + 1,
+            "danger_frames": alert.danger_frames, "reason": a.label, "zone": a.zone.name if a.zone else None,
+            "severity": alert.severity, "ttc": a.ttc, "min_ttc": alert.min_ttc, "hit": a.hit,
+            "motion": a.motion_magnitude, "box": list(a.box), "lost": lost,
+        }
+
+    def _escalated(self, alert, a):
+        if a.zone is not None and alert.severity is not None and a.zone.severity > alert.severity:
+            return True
+        return a.ttc is not None and alert.min_ttc is not None and a.ttc <= alert.min_ttc - self.ttc_step
+
+    def _note_danger(self, frame_no, alert, a):
+        alert.danger_frames += 1
+        alert.last_frame = frame_no
+        alert.last = a
+        if a.zone is not None:
+            alert.severity = max(alert.severity or 0, a.zone.severity)
+        if a.ttc is not None and (alert.min_ttc is None or a.ttc < alert.min_ttc):
+            alert.min_ttc = a.ttc
+        self.counts["danger_frames"] += 1
+
+    def update(self, frame_no, assessments, lost_ids=()):
+        """
+        Advance every track by one frame.
+
+        Args:
+            assessments: DangerAssessments of the tracks seen this frame
+            lost_ids: ids whose tracks ended this frame
+
+        Returns:
+            List of event dicts ("type" is "start", "update" or "end").
+        """
+        events = []
+        seen = set()
+        for a in assessments:
+            seen.add(a.track_id)
+            alert = self.tracks.get(a.track_id)
+            if alert is None:
+                if not a.is_danger:
+                    continue
+                alert = self.tracks[a.track_id] = TrackAlert()
+            events.extend(self._step(frame_no, alert, a.is_danger, a))
+
+        # Görünmeyen izler güvenli kare sayılır
+        for track_id, alert in list(self.tracks.items()):
+            if track_id not in seen:
+                events.extend(self._step(frame_no, alert, False, None))
+            if alert.state is AlertState.IDLE:
+                del self.tracks[track_id]
+
+        for track_id in lost_ids:
+            alert = self.tracks.pop(track_id, None)
+            if alert is not None and alert.state in (AlertState.ALARM, AlertState.COOLDOWN):
+                events.append(self._event("end", frame_no, alert, lost=True))
+        return events
+
+    def _step(self, frame_no, alert, is_danger, a):
+        state = alert.state
+        if is_danger:
+            alert.misses = 0
+            if state is AlertState.IDLE:
+                alert.state = state = AlertState.WARNING
+                alert.hits = alert.danger_frames = 0
+                alert.severity = alert.min_ttc = None
+                alert.start_frame = frame_no
+            alert.hits += 1
+
+            if state is AlertState.ALARM:
+                escalated = self._escalated(alert, a)
+                self._note_danger(frame_no, alert, a)
+                return [self._event("update", frame_no, alert)] if escalated else []
+
+            self._note_danger(frame_no, alert, a)
+            if alert.hits < self.enter_frames:
+                return []
+            alert.state = AlertState.ALARM
+            if state is AlertState.COOLDOWN:
+                return [self._event("update", frame_no, alert)]
+            alert.hazard = self._next_hazard
+            self._next_hazard += 1
+            return [self._event("start", frame_no, alert)]
+
+        alert.misses += 1
+        if state is AlertState.WARNING:
+            if alert.misses >= self.exit_frames:
+                alert.state = AlertState.IDLE
+        elif state is AlertState.ALARM:
+            if alert.misses >= self.exit_frames:
+                alert.state = AlertState.COOLDOWN
+                alert.cooldown_left = self.cooldown_frames
+                alert.hits = 0
+        elif state is AlertState.COOLDOWN:
+            alert.cooldown_left -= 1
+            if alert.cooldown_left <= 0:
+                alert.state = AlertState.IDLE
+                return [self._event("end", frame_no, alert)]
+        return []
+
+    def alarming(self):
+        """Ids of tracks currently in the alarm state."""
+        return {tid for tid, alert in self.tracks.items() if alert.state is AlertState.ALARM}
+
+    def close(self, frame_no):
+        """End every open hazard (session over)."""
+        events = [self._event("end", frame_no, alert, lost=True) for alert in self.tracks.values()
+                  if alert.state in (AlertState.ALARM, AlertState.COOLDOWN)]
+        self.tracks.clear()
+        return events
@@ -1,11 +1,23 @@
+import queue
 import threading
-import pygame
 import time
 
-def play_alert(path, volume=0.8, duration=2):
-    def _play():
+# Tek bir kalıcı çalma thread'i; her alarm için yeni thread açılmaz
+_alert_queue = queue.Queue(maxsize=1)
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def _alert_worker():
+    pygame = None
+    mixer_ready = False
+    while True:
+        path, volume, duration = _alert_queue.get()
         try:
-            pygame.mixer.init()
+            if not mixer_ready:
+                import pygame
+                pygame.mixer.init()
+                mixer_ready = True
             pygame.mixer.music.load(path)
             pygame.mixer.music.set_volume(volume)
             pygame.mixer.music.play()
@@ -14,4 +26,15 @@ def play_alert(path, volume=0.8, duration=2):
         except Exception as e:
             print(f"[AUDIO ERROR] {e}")
 
-    threading.Thread(target=_play, daemon=True).start()
\ No newline at end of file
+
+def play_alert(path, volume=0.8, duration=2):
+    """Queue an alert sound; dropped if one is already waiting to play."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = threading.Thread(target=_alert_worker, daemon=True)
+            _worker.start()
+    try:
+        _alert_queue.put_nowait((path, volume, duration))
+    except queue.Full:
+        pass
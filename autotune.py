@@ -0,0 +1,212 @@
+"""
+Startup auto-tuner for the detection pipeline.
+
+Benchmarks a short sample from the camera (or a video) on this machine over
+frame size, YOLO input size, torch/OpenCV thread counts and inference
+stride, picks the highest-fidelity configuration that still reaches the
+target FPS and stores it in user_config.json, where run_detection picks it
+up on the next start.
+
+Inference stride is only offered for video files: a live camera's grab()
+waits for the next frame, so skipping frames there does not buy any
+throughput, it only leaves gaps in the tracks.
+
+    python autotune.py --target-fps 15
+    python autotune.py --video kayit.mp4 --target-fps 20 --dry-run
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+
+from config import DEFAULTS, load_user_settings, save_user_settings
+from detector import apply_thread_settings
+from frame_index import skip_frames
+from geometry import getzones
+from renderer import OverlayRenderer
+
+FRAME_SIZES = [(1280, 720), (960, 540), (640, 360)]
+IMGSZ = [640, 480, 320]
+STRIDES = [1, 2, 3]
+
+
+def read_sample(source, n_frames):
+    cap = cv2.VideoCapture(source)
+    frames = []
+    while len(frames) < n_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def resize_to(frame, max_w, max_h):
+    h, w = frame.shape[:2]
+    if w > max_w or h > max_h:
+        scale = min(max_w / w, max_h / h)
+        frame = cv2.resize(frame, (int(w * scale), int(h * scale)))
+    return frame
+
+
+def time_config(model, frames, max_w, max_h, imgsz, use_track=True, warmup=2, cap=None, stride=1):
+    """
+    Seconds per processed frame for resize + detection/tracking + overlay
+    at this setting, plus grab() of the stride - 1 skipped frames from `cap`
+    when striding. Danger logic and display are not included.
+    """
+    renderer = OverlayRenderer()
+
+    def step(frame):
+        if stride > 1 and skip_frames(cap, stride - 1) < stride - 1:
+            # Video bitti: başa sarılır, ölçüm bir sonraki karede devam eder
+            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        frame = resize_to(frame, max_w, max_h)
+        if use_track:
+            model.track(frame, persist=True, imgsz=imgsz, verbose=False)
+        else:
+            model.predict(frame, imgsz=imgsz, verbose=False)
+        h, w = frame.shape[:2]
+        vehicle_box, crash_box = getzones(w, h, DEFAULTS["vehicle_box_y_ratio"], DEFAULTS["crash_zone_x_ratio"],
+                                          DEFAULTS["crash_zone_y_ratio"])
+        renderer.render(frame, vehicle_box, crash_box, (), 0.0)
+
+    for frame in frames[:warmup]:
+        step(frame)
+    t0 = time.perf_counter()
+    for frame in frames:
+        step(frame)
+    return (time.perf_counter() - t0) / len(frames)
+
+
+def current_threads():
+    """(torch, OpenCV) thread counts in effect now; torch is None without torch."""
+    try:
+        import torch
+        torch_threads = torch.get_num_threads()
+    except ImportError:
+        torch_threads = None
+    return torch_threads, cv2.getNumThreads()
+
+
+def set_threads(torch_threads, cv_threads, defaults):
+    """
+    Apply a candidate; 0 / -1 explicitly restore the counts recorded in
+    `defaults` before the sweep instead of keeping the previous candidate's.
+    """
+    if torch_threads > 0:
+        apply_thread_settings({"torch_threads": torch_threads})
+    elif defaults[0] is not None:
+        apply_thread_settings({"torch_threads": defaults[0]})
+    if cv_threads >= 0:
+        cv2.setNumThreads(cv_threads)
+    else:
+        # -1 OpenCV'yi kendi varsayılanına döndürür
+        cv2.setNumThreads(-1)
+    return current_threads()
+
+
+def thread_candidates():
+    cpus = os.cpu_count() or 1
+    torch_opts = sorted({0, cpus, max(1, cpus // 2), max(1, cpus // 4)})
+    cv_opts = [-1, 1, cpus]
+    return [(t, c) for t in torch_opts for c in sorted(set(cv_opts))]
+
+
+def fidelity(cfg):
+    """
+    Sort key: every frame inferred first, then larger input, then larger
+    frame. A smaller model on every frame warns sooner than a larger one
+    that sees only every third frame.
+    """
+    return -cfg["frame_stride"], cfg["inference_imgsz"], cfg["max_frame_width"]
+
+
+def tune(model, frames, target_fps, use_track=True, log=print, cap=None):
+    """
+    Sweep thread counts, then frame size x input size x stride. Strides
+    above 1 are only tried with `cap` (an open video file), whose grab()
+    cost is measured along with the processed frames.
+    """
+    # 1) Thread counts on a middle configuration
+    defaults = current_threads()
+    best_threads, best_t = None, float("inf")
+    for torch_opt, cv_opt in thread_candidates():
+        # Kaydedilen değerler ölçülen gerçek sayılardır (0 / -1 değil)
+        torch_threads, cv_threads = set_threads(torch_opt, cv_opt, defaults)
+        t = time_config(model, frames, 960, 540, 480, use_track)
+        log(f"  torch={torch_opt:<3}({torch_threads}) cv={cv_opt:<3}({cv_threads}) {1 / t:6.1f} FPS")
+        if t < best_t:
+            best_threads, best_t = (torch_threads or 0, cv_threads), t
+    torch_threads, cv_threads = best_threads
+    apply_thread_settings({"torch_threads": torch_threads, "cv_threads": cv_threads})
+
+    # 2) Frame size x input size x stride; FPS is source frames covered per second
+    strides = STRIDES if cap is not None else [1]
+    candidates = []
+    for max_w, max_h in FRAME_SIZES:
+        for imgsz in IMGSZ:
+            if imgsz > max_w:
+                continue
+            for stride in strides:
+                t = time_config(model, frames, max_w, max_h, imgsz, use_track, cap=cap, stride=stride)
+                log(f"  {max_w}x{max_h} imgsz={imgsz:<4} stride={stride} {stride / t:6.1f} FPS")
+                candidates.append({
+                    "max_frame_width": max_w, "max_frame_height": max_h, "inference_imgsz": imgsz,
+                    "frame_stride": stride, "torch_threads": torch_threads, "cv_threads": cv_threads,
+                    "_fps": stride / t,
+                })
+
+    meeting = [c for c in candidates if c["_fps"] >= target_fps]
+    if meeting:
+        return max(meeting, key=fidelity)
+    # Hedef tutturulamazsa en hızlısı
+    return max(candidates, key=lambda c: c["_fps"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pick the fastest configuration meeting a target FPS")
+    parser.add_argument("--target-fps", type=float, default=15.0)
+    parser.add_argument("--video", help="sample from this video instead of the camera")
+    parser.add_argument("--frames", type=int, default=20, help="sample frames per measurement")
+    parser.add_argument("--dry-run", action="store_true", help="do not write user_config.json")
+    args = parser.parse_args(argv)
+
+    settings = load_user_settings()
+    source = args.video if args.video else settings.get("camera_index", 0)
+    frames = read_sample(source, args.frames)
+    if not frames:
+        print("Örnek kare okunamadı.")
+        return 1
+
+    from ultralytics import YOLO
+    model = YOLO(settings.get("model_path", "models/yolov8n.pt"))
+
+    # Kare atlama yalnızca video dosyasında denenir; kamerada grab() sonraki kareyi bekler
+    cap = cv2.VideoCapture(args.video) if args.video else None
+
+    print(f"{len(frames)} kare ile ölçülüyor, hedef {args.target_fps} FPS")
+    print("Ölçüm: küçültme + çıkarım/izleme + çizim + atlanan karelerin grab() maliyeti; "
+          "tehlike mantığı ve ekran dahil değil")
+    if cap is None:
+        print("Kamera kaynağı: kare atlama denenmiyor (frame_stride=1)")
+    best = tune(model, frames, args.target_fps, settings.get("tracker_backend", "ultralytics") != "iou", cap=cap)
+    if cap is not None:
+        cap.release()
+    fps = best.pop("_fps")
+    status = "hedef karşılandı" if fps >= args.target_fps else "hedef karşılanamadı, en hızlısı seçildi"
+    print(f"Seçilen ({status}, ~{fps:.1f} FPS): {best}")
+
+    if not args.dry_run:
+        settings = dict(settings)
+        settings.update(best)
+        save_user_settings(settings)
+        print("user_config.json güncellendi.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+End-to-end alert latency benchmark on scripted collision scenarios.
+
+Each scenario places objects on scripted trajectories into, towards or past
+the crash box from getzones, with a known frame where each object starts
+moving and (if it does) first enters the crash zone. The scenarios are run
+through the real run_detection loop with the stub detector and a fixed
+prediction FPS, so the results are reproducible on a CPU-only machine.
+
+Per object it reports:
+    frame latency   frames from the start of the motion to the first alarm
+    wall latency    the same in milliseconds at the scenario FPS, plus the
+                    measured processing time of the alarming frame
+    lead            frames between the alarm and the actual zone entry
+    outcome         ok / late / missed / false_alarm
+
+    python bench_alert_latency.py
+    python bench_alert_latency.py --inference-ms 40 --json sonuc.json
+    python bench_alert_latency.py --max-false-alarms 2
+
+The exit code is 1 if any object is missed or late, or if there are more
+false alarms than --max-false-alarms (0 by default).
+"""
+import argparse
+import json
+import sys
+
+from config import DEFAULTS
+from detector import run_detection
+from geometry import boxes_overlap, getzones
+from synthetic import ScriptedObject, StubModel, SyntheticCapture
+
+WIDTH, HEIGHT, FPS = 1280, 720, 30.0
+
+
+def build_scenarios():
+    """Scenario name -> (frame count, objects, detector miss rate)."""
+    return {
+        "yaya_gecisi": (180, [
+            ScriptedObject(1, "person", (40, 300, 100, 450), (6, 0), hold_frames=30),
+        ], 0.0),
+        "karsidan_arac": (150, [
+            ScriptedObject(1, "car", (600, 250, 680, 310), (0, 2), hold_frames=20, growth=1.5),
+        ], 0.0),
+        "motosiklet_kesme": (120, [
+            ScriptedObject(1, "motorcycle", (1200, 400, 1260, 460), (-15, 0), hold_frames=30),
+        ], 0.0),
+        "titrek_yaya_girisi": (180, [
+            ScriptedObject(1, "person", (40, 300, 100, 450), (5, 0), hold_frames=30, jitter=3.0, seed=7),
+        ], 0.1),
+        "yandan_gecen_bisiklet": (180, [
+            ScriptedObject(1, "bicycle", (0, 200, 50, 300), (8, 0), hold_frames=10),
+        ], 0.0),
+        # Durduğu yer tahmin ufkunun (3 px x 60 kare) dışında: ufuk içinde duran nesne için alarm doğrudur
+        "duran_yaya": (180, [
+            ScriptedObject(1, "person", (1220, 320, 1270, 450), (-3, 0), hold_frames=20, move_frames=15),
+        ], 0.0),
+        "park_halindeki_arac": (150, [
+            ScriptedObject(1, "car", (975, 400, 1110, 480), (0, 0), jitter=2.0, seed=3),
+        ], 0.0),
+        "coklu_nesne": (200, [
+            ScriptedObject(1, "person", (1180, 320, 1230, 450), (-5, 0), hold_frames=40),
+            ScriptedObject(2, "car", (100, 150, 220, 230), (3, 0)),
+            ScriptedObject(3, "dog", (200, 600, 260, 650), (0, 0), jitter=1.0, seed=5),
+        ], 0.0),
+    }
+
+
+def ground_truth(obj, crash_box, frame_count):
+    """(heading_frame, entry_frame or None) of a scripted object."""
+    heading = obj.start_frame + obj.hold_frames
+    for frame_no in range(obj.start_frame, frame_count):
+        if boxes_overlap(obj.box_at(frame_no - obj.start_frame), crash_box):
+            return heading, frame_no
+    return heading, None
+
+
+def run_scenario(name, frame_count, objects, miss_rate, settings, inference_s):
+    cap = SyntheticCapture(WIDTH, HEIGHT, frame_count=frame_count, objects=objects, fps=FPS)
+    model = StubModel(objects, capture=cap, miss_rate=miss_rate, latency_s=inference_s, seed=1)
+
+    first_alarm = {}
+    latencies = {}
+
+    def on_event(event):
+        first_alarm.setdefault(event["id"], event["frame"] - 1)
+
+    def on_frame(frame_count, latency_s):
+        latencies[frame_count - 1] = latency_s
+
+    run_detection(mode="test", model=model, cap=cap, settings=settings, headless=True,
+                  on_frame=on_frame, on_event=on_event)
+
+    _, crash_box = getzones(WIDTH, HEIGHT, settings["vehicle_box_y_ratio"],
+                            settings["crash_zone_x_ratio"], settings["crash_zone_y_ratio"])
+    rows = []
+    for obj in objects:
+        heading, entry = ground_truth(obj, crash_box, frame_count)
+        alarm = first_alarm.get(obj.id)
+        row = {"scenario": name, "id": obj.id, "class": obj.cls_name, "heading_frame": heading,
+               "entry_frame": entry, "alarm_frame": alarm, "frame_latency": None,
+               "wall_latency_ms": None, "lead_frames": None}
+        if alarm is not None:
+            row["frame_latency"] = alarm - heading
+            row["wall_latency_ms"] = (alarm - heading) / FPS * 1000 + latencies.get(alarm, 0.0) * 1000
+        if entry is not None and alarm is not None:
+            row["lead_frames"] = entry - alarm
+
+        if entry is None:
+            row["outcome"] = "false_alarm" if alarm is not None else "ok"
+        elif alarm is None:
+            row["outcome"] = "missed"
+        else:
+            row["outcome"] = "ok" if alarm <= entry else "late"
+        rows.append(row)
+    return rows
+
+
+def _fmt(value, spec="d"):
+    return "-" if value is None else format(value, spec)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Alert latency benchmark on synthetic scenarios")
+    parser.add_argument("--inference-ms", type=float, default=0.0, help="simulated detector time per frame")
+    parser.add_argument("--scenario", action="append", help="run only these scenarios")
+    parser.add_argument("--json", help="write per-object results to this file")
+    parser.add_argument("--max-false-alarms", type=int, default=0,
+                        help="fail if more objects than this alarm without entering the crash zone")
+    args = parser.parse_args(argv)
+
+    # Kullanıcı ayarları yerine varsayılanlar: sonuçlar makineden bağımsız olsun
+    settings = dict(DEFAULTS, fixed_fps=FPS, alarm_enabled=False, enable_log=False, enable_fbf=False,
+                    debug_draw=False, event_store_enabled=False, stream_enabled=False)
+
+    rows = []
+    for name, (frame_count, objects, miss_rate) in build_scenarios().items():
+        if args.scenario and name not in args.scenario:
+            continue
+        rows.extend(run_scenario(name, frame_count, objects, miss_rate, settings, args.inference_ms / 1000))
+
+    print(f"{'senaryo':<24}{'id':>3} {'sınıf':<11}{'hareket':>8}{'giriş':>7}{'alarm':>7}"
+          f"{'gecikme':>9}{'ms':>9}{'önce':>6}  sonuç")
+    for r in rows:
+        print(f"{r['scenario']:<24}{r['id']:>3} {r['class']:<11}{r['heading_frame']:>8}"
+              f"{_fmt(r['entry_frame']):>7}{_fmt(r['alarm_frame']):>7}{_fmt(r['frame_latency']):>9}"
+              f"{_fmt(r['wall_latency_ms'], '.1f'):>9}{_fmt(r['lead_frames']):>6}  {r['outcome']}")
+
+    detected = [r for r in rows if r["entry_frame"] is not None and r["alarm_frame"] is not None]
+    missed = sum(r["outcome"] == "missed" for r in rows)
+    late = sum(r["outcome"] == "late" for r in rows)
+    false_alarms = sum(r["outcome"] == "false_alarm" for r in rows)
+    if detected:
+        mean_latency = sum(r["frame_latency"] for r in detected) / len(detected)
+        mean_lead = sum(r["lead_frames"] for r in detected) / len(detected)
+        print(f"\nOrtalama gecikme {mean_latency:.1f} kare ({mean_latency / FPS * 1000:.0f} ms), "
+              f"girişten ortalama {mean_lead:.1f} kare önce")
+    print(f"Kaçırılan: {missed}, geç: {late}, yanlış alarm: {false_alarms}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+    if false_alarms > args.max_false_alarms:
+        print(f"Yanlış alarm sayısı sınırı aşıyor ({false_alarms} > {args.max_false_alarms})")
+    return 1 if missed or late or false_alarms > args.max_false_alarms else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
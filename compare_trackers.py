@@ -0,0 +1,140 @@
+"""
+Compare the built-in IoUTracker with Ultralytics model.track on a clip.
+
+For every frame the detector runs once through model.predict (detection
+only) and once through model.track (detection + BoT-SORT/ByteTrack), so the
+tracker's own cost is the difference; IoUTracker is timed on the predict
+boxes. The two calls go to separate model instances: after the first
+track() Ultralytics leaves its tracker callbacks registered on the model,
+and a predict() on the same instance would step the tracker again and
+return only the tracked boxes. Agreement is the share of matched detections whose IoUTracker id
+is the one most often paired with the same Ultralytics id over the clip.
+
+    python compare_trackers.py kayit.mp4 --frames 600
+    python compare_trackers.py --stub
+"""
+import argparse
+import sys
+import time
+from collections import Counter, defaultdict
+
+import cv2
+
+from config import load_user_settings
+from iou_tracker import IoUTracker, iou_matrix
+
+
+def _boxes_of(results, names, critical):
+    out = []
+    for box in results.boxes:
+        cls = int(box.cls[0])
+        if names[cls] not in critical:
+            continue
+        obj_id = int(box.id[0]) if box.id is not None else None
+        out.append((obj_id, cls, tuple(float(c) for c in box.xyxy[0])))
+    return out
+
+
+def compare(model, track_model, cap, settings, max_frames, tracker_kwargs):
+    critical = settings["critical_objects"]
+    tracker = IoUTracker(**tracker_kwargs)
+
+    predict_s = track_s = iou_s = 0.0
+    pairs = []
+    ids_ultra, ids_iou = set(), set()
+    frames = 0
+
+    while frames < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames += 1
+
+        t0 = time.perf_counter()
+        det = _boxes_of(model.predict(frame, verbose=False)[0], model.names, critical)
+        t1 = time.perf_counter()
+        ultra = _boxes_of(track_model.track(frame, persist=True, verbose=False)[0], track_model.names, critical)
+        t2 = time.perf_counter()
+        ids = tracker.update([d[2] for d in det], [d[1] for d in det])
+        t3 = time.perf_counter()
+        predict_s += t1 - t0
+        track_s += t2 - t1
+        iou_s += t3 - t2
+
+        ours = [(int(i), d[2]) for i, d in zip(ids.tolist(), det) if i > 0]
+        ultra = [(u[0], u[2]) for u in ultra if u[0] is not None]
+        ids_ultra.update(u for u, _ in ultra)
+        ids_iou.update(i for i, _ in ours)
+        if not ours or not ultra:
+            continue
+
+        overlap = iou_matrix([b for _, b in ultra], [b for _, b in ours])
+        for r in range(overlap.shape[0]):
+            c = int(overlap[r].argmax())
+            if overlap[r, c] >= 0.5:
+                pairs.append((ultra[r][0], ours[c][0]))
+
+    dominant = {}
+    by_ultra = defaultdict(Counter)
+    for u, i in pairs:
+        by_ultra[u][i] += 1
+    for u, counts in by_ultra.items():
+        dominant[u] = counts.most_common(1)[0][0]
+    agree = sum(dominant[u] == i for u, i in pairs)
+
+    return {
+        "frames": frames,
+        "predict_ms": predict_s / max(frames, 1) * 1000,
+        "track_overhead_ms": max(track_s - predict_s, 0.0) / max(frames, 1) * 1000,
+        "iou_tracker_ms": iou_s / max(frames, 1) * 1000,
+        "matched": len(pairs),
+        "agreement": agree / len(pairs) if pairs else 0.0,
+        "ids_ultralytics": len(ids_ultra),
+        "ids_iou": len(ids_iou),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="IoUTracker vs model.track")
+    parser.add_argument("video", nargs="?", help="recorded clip")
+    parser.add_argument("--frames", type=int, default=1000)
+    parser.add_argument("--model", default="models/yolov8n.pt")
+    parser.add_argument("--stub", action="store_true", help="synthetic traffic with the stub detector")
+    args = parser.parse_args(argv)
+
+    settings = load_user_settings()
+    tracker_kwargs = {
+        "iou_threshold": settings.get("iou_tracker_threshold", 0.3),
+        "max_age": settings.get("iou_tracker_max_age", 5),
+        "min_hits": settings.get("iou_tracker_min_hits", 1),
+        "matching": settings.get("iou_tracker_matching", "greedy"),
+    }
+
+    if args.stub:
+        from synthetic import StubModel, SyntheticCapture, random_traffic
+        objects = random_traffic(12, period=200)
+        cap = SyntheticCapture(objects=objects, frame_count=args.frames)
+        model = StubModel(objects, capture=cap)
+        track_model = StubModel(objects, capture=cap)
+    elif args.video:
+        from ultralytics import YOLO
+        cap = cv2.VideoCapture(args.video)
+        model = YOLO(args.model)
+        track_model = YOLO(args.model)
+    else:
+        parser.error("a video path or --stub is required")
+
+    r = compare(model, track_model, cap, settings, args.frames, tracker_kwargs)
+    cap.release()
+
+    print(f"Kare: {r['frames']}")
+    print(f"Tespit (predict):          {r['predict_ms']:.2f} ms/kare")
+    print(f"model.track ek maliyeti:   {r['track_overhead_ms']:.2f} ms/kare")
+    print(f"IoUTracker:                {r['iou_tracker_ms']:.3f} ms/kare")
+    print(f"Uyum: {r['agreement'] * 100:.1f}% ({r['matched']} eşleşen tespit), "
+          f"kimlik sayısı ultralytics={r['ids_ultralytics']} iou={r['ids_iou']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,16 +8,77 @@ DEFAULTS = {
     "camera_index": 0,
     "camera_name": "Camera 0",
     "alert_cooldown_frames": 15,
+    "alert_enter_frames": 2,
+    "alert_exit_frames": 5,
+    "alert_ttc_step": 0.5,
     "position_history_frames": 6,
     "movement_threshold": 3.0,
+    "min_speed_px_s": 60.0,
     "debug_draw": False,
     "enable_log": False,
     "enable_fbf": False,
+    "review_cache_mb": 256,
+    "review_checkpoint_every": 30,
+    "review_max_checkpoints": 20,
     "alarm_volume": 0.8,
     "alarm_enabled": True,
     "alarm_path": "assets/alert.mp3",
     "history_length": 5,
     "seconds_to_predict": 2,
+    "danger_method": "slab",
+    "fixed_fps": 0,
+    "tracker_backend": "ultralytics",
+    "iou_tracker_threshold": 0.3,
+    "iou_tracker_max_age": 5,
+    "iou_tracker_min_hits": 1,
+    "iou_tracker_matching": "greedy",
+    "motion_model": "kalman",
+    "kalman_process_noise": 1.0,
+    "kalman_measurement_noise": 4.0,
+    "track_max_gap_frames": 5,
+    "model_path": "models/yolov8n.pt",
+    "max_frame_width": 1280,
+    "max_frame_height": 720,
+    "inference_imgsz": 640,
+    "torch_threads": 0,
+    "cv_threads": -1,
+    "tiled_inference": False,
+    "tile_size": 640,
+    "tile_overlap": 0.2,
+    "tile_nms_iou": 0.5,
+    "tile_recent_frames": 15,
+    "tile_max_skip": 30,
+    "tile_change_threshold": 6.0,
+    "tile_zone_margin": 0.15,
+    "tile_global_pass": True,
+    "tile_max_batch": 0,
+    "overlay_refresh_frames": 1,
+    "frame_stride": 1,
+    "frame_pool_depth": 2,
+    "motion_gate_enabled": False,
+    "motion_gate_width": 160,
+    "motion_gate_grid": [8, 6],
+    "motion_gate_cell_threshold": 8.0,
+    "motion_gate_min_changed_ratio": 0.02,
+    "motion_gate_max_skip": 10,
+    "motion_gate_zone_margin": 0.05,
+    "zones": [],
+    "zone_grid_cell": 64,
+    "event_store_enabled": True,
+    "event_store_path": "events.db",
+    "profile_enabled": False,
+    "profile_budget_ms": 100.0,
+    "profile_window": 120,
+    "profile_dir": "profiles",
+    "profile_capture_frames": 30,
+    "profile_sample_ms": 5.0,
+    "profile_max_dumps": 20,
+    "stream_enabled": False,
+    "stream_host": "127.0.0.1",
+    "stream_port": 8080,
+    "stream_fps": 10,
+    "stream_max_width": 640,
+    "stream_jpeg_quality": 70,
     "critical_objects": [
         "person", "bicycle", "car", "motorcycle", "bus", "train", "truck",
         "traffic light", "fire hydrant", "stop sign", "parking meter",
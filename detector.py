@@ -1,148 +1,421 @@
 import cv2
 import time
 
-from sympy import false
-from ultralytics import YOLO
 from config import load_user_settings
-from tracker import TrackedObject
-from logic import is_dangerous
-from geometry import getzones, get_predicted_vectors
+from tracker import TrackingState
+from logic import assess_dangers
+from geometry import getzones, get_named_zones
+from zones import ZoneGrid
+from kalman import BoxKalmanBank
+from iou_tracker import IoUTracker
+from motion_gate import MotionGate
+from tiling import TiledDetector
 from audio import play_alert
+from alerts import AlertManager
+from renderer import OverlayRenderer
+from stream_server import StreamServer
+from frame_index import load_frame_index, seek, skip_frames
+from event_store import EventStore
+from review import ReviewCache, Reviewer
+from frame_profiler import FrameProfiler
+from frame_pool import FramePool
 import logging
 
 # Frame sabiti
 MAX_W, MAX_H = 1280, 720
 logging.getLogger('ultralytics').setLevel(logging.CRITICAL)
 
-fps_perframe = {}
-def run_detection(mode="test", video_path=None, start_frame=0):
-    USER_SETTINGS = load_user_settings()
+
+def apply_thread_settings(settings):
+    """Apply tuned torch/OpenCV thread counts; 0 / -1 keep the library defaults."""
+    cv_threads = settings.get("cv_threads", -1)
+    if cv_threads >= 0:
+        cv2.setNumThreads(cv_threads)
+    torch_threads = settings.get("torch_threads", 0)
+    if torch_threads > 0:
+        try:
+            import torch
+            torch.set_num_threads(torch_threads)
+        except ImportError:
+            pass
+
+
+def run_detection(mode="test", video_path=None, start_frame=0, model=None, cap=None,
+                  settings=None, headless=False, on_frame=None, on_event=None, pool=None, release_capture=True):
+    """
+    Run the detection loop on a camera or video file.
+
+    model, cap and settings can be injected (e.g. a stub detector and a
+    synthetic capture for soak tests). An injected cap is read from its
+    current position; a DetectionSession also passes its FramePool and
+    release_capture=False to keep both for the next run. With
+    headless=True nothing is shown on screen. on_frame(frame_count,
+    latency_s) is called after every processed frame; returning False
+    stops the loop. on_event(event) is called with a dict for every danger
+    detection.
+    """
+    USER_SETTINGS = settings if settings is not None else load_user_settings()
     LOGGING_ENABLED = USER_SETTINGS["enable_log"]
     ZONE_HISTORY_LENGTH = USER_SETTINGS["position_history_frames"]
 
     # Kamera/video kaynağı
-    if mode == "test":
+    if cap is not None:
+        pass
+    elif mode == "test":
         if not video_path:
             video_path = "../../data/test/2.mp4"
         cap = cv2.VideoCapture(video_path)
-        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        if start_frame:
+            # Keyframe index ile doğru ve hızlı konumlama
+            seek(cap, load_frame_index(video_path), start_frame)
     else:
         cam_index = USER_SETTINGS.get("camera_index", 0)
         cap = cv2.VideoCapture(cam_index)
 
-    model = YOLO("models/yolov8n.pt")
-    tracked_objects = {}
+    apply_thread_settings(USER_SETTINGS)
+    if model is None:
+        # Stub modellerle (soak testi) ultralytics gerekmez
+        from ultralytics import YOLO
+        model = YOLO(USER_SETTINGS.get("model_path", "models/yolov8n.pt"))
+    max_w = USER_SETTINGS.get("max_frame_width", MAX_W)
+    max_h = USER_SETTINGS.get("max_frame_height", MAX_H)
+    imgsz = USER_SETTINGS.get("inference_imgsz", 640)
+    track_summary = {}
     frame_count = 0
+
+    events = None
+    session_id = None
+    if USER_SETTINGS.get("event_store_enabled", True):
+        events = EventStore(USER_SETTINGS.get("event_store_path", "events.db"))
+        source = video_path if mode == "test" else f"camera:{USER_SETTINGS.get('camera_index', 0)}"
+        model_name = getattr(model, "ckpt_path", None) or type(model).__name__
+        session_id = events.start_session(source, USER_SETTINGS, model_name)
     vehicle_box, crash_box = None, None
+    zone_grid = None
+    zone_totals = {"culled": 0, "evaluated": 0}
+
+    kalman = None
+    if USER_SETTINGS.get("motion_model", "kalman") == "kalman":
+        kalman = BoxKalmanBank(USER_SETTINGS.get("kalman_process_noise", 1.0),
+                               USER_SETTINGS.get("kalman_measurement_noise", 4.0),
+                               USER_SETTINGS.get("track_max_gap_frames", 5))
+    tracks = TrackingState(ZONE_HISTORY_LENGTH, kalman)
+
+    # Dahili IoU izleyici: model.track yerine model.predict + NumPy eşleştirme
+    # Karolu çıkarımda kimlikler de dahili izleyiciden gelir (toplu predict, track yok)
+    tiled = USER_SETTINGS.get("tiled_inference", False)
+    iou_tracker = None
+    if USER_SETTINGS.get("tracker_backend", "ultralytics") == "iou" or tiled:
+        iou_tracker = IoUTracker(USER_SETTINGS.get("iou_tracker_threshold", 0.3),
+                                 USER_SETTINGS.get("iou_tracker_max_age", 5),
+                                 USER_SETTINGS.get("iou_tracker_min_hits", 1),
+                                 USER_SETTINGS.get("iou_tracker_matching", "greedy"))
+    gate = None
+    if USER_SETTINGS.get("motion_gate_enabled", False):
+        gate = MotionGate(USER_SETTINGS.get("motion_gate_width", 160),
+                          tuple(USER_SETTINGS.get("motion_gate_grid", (8, 6))),
+                          USER_SETTINGS.get("motion_gate_cell_threshold", 8.0),
+                          USER_SETTINGS.get("motion_gate_min_changed_ratio", 0.02),
+                          USER_SETTINGS.get("motion_gate_max_skip", 10),
+                          USER_SETTINGS.get("motion_gate_zone_margin", 0.05))
+    tiler = None
+    if tiled:
+        tiler = TiledDetector(model, USER_SETTINGS.get("tile_size", 640),
+                              USER_SETTINGS.get("tile_overlap", 0.2),
+                              USER_SETTINGS.get("tile_nms_iou", 0.5),
+                              USER_SETTINGS.get("tile_recent_frames", 15),
+                              USER_SETTINGS.get("tile_max_skip", 30),
+                              USER_SETTINGS.get("tile_change_threshold", 6.0),
+                              USER_SETTINGS.get("tile_zone_margin", 0.15),
+                              USER_SETTINGS.get("tile_global_pass", True),
+                              USER_SETTINGS.get("tile_max_batch", 0))
     last_frame_time = time.time()
     fps = 0
+    fps_sum = 0.0
+    # Sabit FPS verilirse tahmin ufku makineden bağımsız olur (benchmark/tekrar)
+    fixed_fps = USER_SETTINGS.get("fixed_fps", 0)
 
     fbf_enabled = USER_SETTINGS.get("enable_fbf", False)
+    frame_stride = max(1, int(USER_SETTINGS.get("frame_stride", 1)))
+    renderer = OverlayRenderer(USER_SETTINGS.get("overlay_refresh_frames", 1), USER_SETTINGS["debug_draw"])
+    hints = ["Cikmak icin Q'ya basin"]
+    window = "Yapay Zeka ile Nesne ve Tehlike Tespiti Sistemi"
+    # Okuma ve küçültme sabit tamponlara yapılır; kare başına bellek ayrılmaz
+    if pool is None:
+        pool = FramePool(USER_SETTINGS.get("frame_pool_depth", 2))
+
+    reviewer = None
+    fast_forward_to = 0
+    if fbf_enabled:
+        hints.insert(0, "Ileri: Enter/D  Geri: A  Kareye git: G")
+        if not headless:
+            # Geri/ileri adımlar için çözülmüş kare ve iz önbelleği
+            cache = ReviewCache(USER_SETTINGS.get("review_cache_mb", 256) * 1024 * 1024,
+                                USER_SETTINGS.get("review_checkpoint_every", 30),
+                                USER_SETTINGS.get("review_max_checkpoints", 20), pool.release)
+            cache.checkpoint(0, tracks, force=True)
+            reviewer = Reviewer(cache, OverlayRenderer(1, USER_SETTINGS["debug_draw"]), model.names, USER_SETTINGS,
+                                window, video_path if mode == "test" else None, start_frame, frame_stride,
+                                (max_w, max_h), pool)
+
+    stream = None
+    if USER_SETTINGS.get("stream_enabled", False):
+        stream = StreamServer(USER_SETTINGS.get("stream_host", "127.0.0.1"),
+                              USER_SETTINGS.get("stream_port", 8080),
+                              USER_SETTINGS.get("stream_fps", 10),
+                              USER_SETTINGS.get("stream_max_width", 640),
+                              USER_SETTINGS.get("stream_jpeg_quality", 70))
+        try:
+            stream.start()
+        except OSError as e:
+            # Port doluysa tespit yayınsız devam eder
+            print(f"[STREAM] Sunucu başlatılamadı ({e}), yayın kapalı")
+            stream = None
+
+    alert_manager = AlertManager(USER_SETTINGS.get("alert_enter_frames", 2),
+                                 USER_SETTINGS.get("alert_exit_frames", 5),
+                                 USER_SETTINGS.get("alert_cooldown_frames", 15),
+                                 USER_SETTINGS.get("alert_ttc_step", 0.5))
+
+    def handle_alert(alert):
+        if alert["type"] == "start" and USER_SETTINGS["alarm_enabled"]:
+            play_alert(USER_SETTINGS["alarm_path"],
+                       duration=2,
+                       volume=USER_SETTINGS["alarm_volume"])
+        if events is not None:
+            events.log_event(session_id, alert["frame"], alert["id"], alert["class"],
+                             alert["reason"].split(":", 1)[-1], alert["zone"], alert["severity"], alert["ttc"],
+                             alert["box"], time.time(), alert["type"], alert["hazard"],
+                             alert["duration_frames"])
+        if stream is not None:
+            stream.publish_event(alert)
+        if on_event is not None:
+            on_event(alert)
+        if LOGGING_ENABLED:
+            ttc_text = f", TTC: {alert['ttc']:.2f}s" if alert["ttc"] is not None else ""
+            hit_text = f", Hit: {alert['hit']}" if alert["hit"] else ""
+            print(f"Frame: {alert['frame']}")
+            print(f"⚠️ Alarm {alert['type']} #{alert['hazard']} - ID: {alert['id']}, "
+                  f"Reason: {alert['reason']}{ttc_text}{hit_text}, {alert['duration_frames']} kare")
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
+    # Kare aşama süreleri; bütçeyi aşan kareler diske dökülür
+    profiler = FrameProfiler(USER_SETTINGS.get("profile_enabled", False),
+                             USER_SETTINGS.get("profile_budget_ms", 100.0),
+                             USER_SETTINGS.get("profile_window", 120),
+                             USER_SETTINGS.get("profile_dir", "profiles"),
+                             USER_SETTINGS.get("profile_capture_frames", 30),
+                             USER_SETTINGS.get("profile_sample_ms", 5.0),
+                             USER_SETTINGS.get("profile_max_dumps", 20))
+    if profiler.enabled:
+        hints.insert(0, "Profil kaydi icin P'ye basin")
 
-        frame_count += 1
-        current_time = time.time()
-        fps = 1 / (current_time - last_frame_time + 1e-5)
-        last_frame_time = current_time
+    # Döngü hata ile biterse de sunucu, yazıcı ve pencereler kapatılır (oturum uzun yaşar)
+    try:
+        while True:
+            profiler.begin_frame(frame_count + 1)
+            pool.next_frame()
+            # Atlanan kareler sadece grab() ile geçilir (decode sonrası dönüşüm yok)
+            if frame_count and frame_stride > 1:
+                skip_frames(cap, frame_stride - 1)
+            ret, frame = pool.read(cap)
+            if not ret:
+                break
+            profiler.mark("read")
 
-        fps_perframe[frame_count] = fps
+            frame_start = time.perf_counter()
+            frame_count += 1
+            current_time = time.time()
+            fps = 1 / (current_time - last_frame_time + 1e-5)
+            last_frame_time = current_time
 
-        fps_values = list(fps_perframe.values())
-        average_fps = sum(fps_values) / len(fps_values)
+            # Oturum ortalaması, kare başına bellek tutmadan
+            fps_sum += fps
+            average_fps = fixed_fps or fps_sum / frame_count
 
-        h, w = frame.shape[:2]
-        if w > MAX_W or h > MAX_H:
-            scale = min(MAX_W / w, MAX_H / h)
-            frame = cv2.resize(frame, (int(w * scale), int(h * scale)))
+            # Karolu modda tespit tam çözünürlükte, geri kalan her şey küçültülmüş karede
+            full_frame = frame
+            scale = 1.0
             h, w = frame.shape[:2]
+            if w > max_w or h > max_h:
+                scale = min(max_w / w, max_h / h)
+                frame = pool.resize(frame, (int(w * scale), int(h * scale)))
+                h, w = frame.shape[:2]
+            profiler.mark("resize")
 
-        results = model.track(frame, persist=True)[0]
-        frame_out = results.plot() if USER_SETTINGS["debug_draw"] else frame.copy()
+            if crash_box is None:
+                vehicle_box, crash_box = getzones(w, h, USER_SETTINGS["vehicle_box_y_ratio"],
+                                                  USER_SETTINGS.get("crash_zone_x_ratio"),
+                                                  USER_SETTINGS.get("crash_zone_y_ratio"))
+                # Bölge ızgarası kalibrasyon başına bir kez kurulur
+                zone_grid = ZoneGrid(get_named_zones(w, h, USER_SETTINGS.get("zones"), crash_box), w, h,
+                                     USER_SETTINGS.get("zone_grid_cell", 64))
+                if reviewer is not None:
+                    reviewer.set_layout(vehicle_box, crash_box, zone_grid, hints)
+                if tiler is not None:
+                    tiler.set_zones([tuple(c / scale for c in z.box) for z in zone_grid.zones],
+                                    tuple(c / scale for c in vehicle_box))
 
-        if crash_box is None:
-            vehicle_box, crash_box = getzones(w, h, USER_SETTINGS["vehicle_box_y_ratio"],
-                                              USER_SETTINGS.get("crash_zone_x_ratio"),
-                                              USER_SETTINGS.get("crash_zone_y_ratio"))
+            zone_stats = {"culled": 0, "evaluated": 0}
+            danger_label = None
+            danger_ttc = float("inf")
 
-        if USER_SETTINGS["debug_draw"]:
-            cv2.rectangle(frame_out, (vehicle_box[0], vehicle_box[1]), (vehicle_box[2], vehicle_box[3]), (0, 255, 0), 2)
-            cv2.rectangle(frame_out, (crash_box[0], crash_box[1]), (crash_box[2], crash_box[3]), (0, 0, 255), 2)
+            # Durağan sahnede dedektör atlanır, izler yalnızca tahminle ilerletilir
+            run_model = gate is None or gate.check(frame, [z.box for z in zone_grid.zones])[0]
+            profiler.mark("gate")
+            if run_model:
+                inference_start = time.perf_counter()
+                detections = []
+                if tiler is not None:
+                    for cls, _, box in tiler.detect(full_frame):
+                        if model.names[cls] in USER_SETTINGS["critical_objects"]:
+                            detections.append([None, cls, tuple(int(c * scale) for c in box)])
+                else:
+                    if iou_tracker is not None:
+                        results = model.predict(frame, imgsz=imgsz, verbose=False)[0]
+                    else:
+                        results = model.track(frame, persist=True, imgsz=imgsz, verbose=False)[0]
 
-        cv2.putText(frame_out, f"FPS: {average_fps:.2f}", (frame_out.shape[1] - 150, 50),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+                    for box in results.boxes:
+                        cls = int(box.cls[0])
+                        class_name = model.names[cls]
+                        if class_name not in USER_SETTINGS["critical_objects"]:
+                            continue
+                        obj_id = int(box.id[0]) if box.id is not None else None
+                        detections.append([obj_id, cls, tuple(map(int, box.xyxy[0]))])
 
-        current_ids = set()
-        danger_detected = False
+                if iou_tracker is not None:
+                    ids = iou_tracker.update([d[2] for d in detections], [d[1] for d in detections])
+                    for det, tid in zip(detections, ids.tolist()):
+                        det[0] = tid if tid > 0 else None
+                if gate is not None:
+                    gate.add_inference_time(time.perf_counter() - inference_start)
+            else:
+                detections = None
+            profiler.mark("inference")
 
-        for box in results.boxes:
-            cls = int(box.cls[0])
-            class_name = model.names[cls]
-            obj_id = int(box.id[0]) if box.id is not None else None
-            if obj_id is None or class_name not in USER_SETTINGS["critical_objects"]:
+            if detections is not None:
+                frame_objects, lost_ids = tracks.update(detections, model.names)
+            else:
+                # Eski kutular yeni gözlem sayılmaz (hız sıfıra çekilmesin)
+                frame_objects, lost_ids = tracks.predict()
+            if events is not None:
+                for obj in frame_objects:
+                    summary = track_summary.setdefault(obj.id, [current_time, current_time, 0, 0])
+                    summary[1] = current_time
+                    summary[2] += 1
+            profiler.mark("tracking")
+
+            # Köşeler, hareket ve tahmin iz başına bir kez hesaplanır; çizim ve kayıt bunu okur
+            assessments = assess_dangers(frame_objects, average_fps, zone_grid, USER_SETTINGS, zone_stats)
+            if events is not None:
+                for danger in assessments:
+                    if danger.is_danger:
+                        track_summary[danger.track_id][3] += 1
+            profiler.mark("danger")
+
+            # Tehlike başına tek başlangıç/güncelleme/bitiş olayı (kare başına alarm yok)
+            for alert in alert_manager.update(frame_count, assessments, lost_ids):
+                handle_alert(alert)
+
+            alarm_ids = alert_manager.alarming()
+            for danger in assessments:
+                if danger.track_id in alarm_ids:
+                    # En yakın çarpışma süresine sahip nesne ekranda gösterilir
+                    ttc = alert_manager.tracks[danger.track_id].last.ttc
+                    rank_ttc = ttc if ttc is not None else 0.0
+                    if danger_label is None or rank_ttc < danger_ttc:
+                        danger_label, danger_ttc = danger.cls_name, rank_ttc
+
+            # Silinen objeleri temizle (Kalman modunda kısa kesintiler tolere edilir)
+            for oid in lost_ids:
+                obj = tracks.remove(oid)
+                if events is not None and oid in track_summary:
+                    events.log_track(session_id, oid, obj.cls_name if obj else None, *track_summary.pop(oid))
+
+            for key in zone_totals:
+                zone_totals[key] += zone_stats[key]
+            profiler.mark("alerts")
+
+            info_lines = [f"Elenen: {zone_stats['culled']} / Degerlendirilen: {zone_stats['evaluated']}"]
+            if tiler is not None:
+                t = tiler.last
+                info_lines.append(f"Karo: {t['run']}/{t['tiles']} calisti, {t['ms']:.1f} ms")
+            frame_out = renderer.render(frame, vehicle_box, crash_box, assessments, average_fps, danger_label, hints,
+                                        zone_grid.zones if USER_SETTINGS.get("zones") else (), info_lines, alarm_ids)
+            if stream is not None:
+                stream.publish_frame(frame_out)
+            profiler.mark("render")
+
+            if on_frame is not None and on_frame(frame_count, time.perf_counter() - frame_start) is False:
+                break
+            if headless:
+                continue
+
+            if reviewer is not None:
+                reviewer.record(frame_count, frame, detections, average_fps, assessments, danger_label, tracks,
+                                alarm_ids)
+                if frame_count < fast_forward_to:
+                    continue
+                cv2.imshow(window, frame_out)
+                action = reviewer.interact(frame_count)
+                if action == "quit":
+                    break
+                if isinstance(action, int):
+                    fast_forward_to = action
                 continue
 
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
-            if obj_id not in tracked_objects:
-                tracked_objects[obj_id] = TrackedObject(obj_id, class_name, ZONE_HISTORY_LENGTH)
-
-            obj = tracked_objects[obj_id]
-            obj.add((x1, y1, x2, y2))
-
-            is_danger, reason = is_dangerous(obj, average_fps, crash_box, USER_SETTINGS)
-            current_ids.add(obj_id)
-
-            # Debug yön vektörleri çiz
-            if USER_SETTINGS["debug_draw"] and len(obj.boxes) >= ZONE_HISTORY_LENGTH:
-                last_box = obj.get_last_n_boxes(ZONE_HISTORY_LENGTH)[-1]
-                corners = [(last_box[0], last_box[1]), (last_box[2], last_box[1]),
-                           (last_box[0], last_box[3]), (last_box[2], last_box[3])]
-                raw_vectors = obj.get_corner_motion_vectors(ZONE_HISTORY_LENGTH)
-
-                predicted_vectors = get_predicted_vectors(corners, raw_vectors, average_fps, USER_SETTINGS["seconds_to_predict"])
-                for corner, predicted in zip(corners, predicted_vectors):
-                    cv2.arrowedLine(frame_out, corner, (int(predicted[0]), int(predicted[1])), (255, 0, 255), 2)
-
-            if is_danger:
-                cv2.rectangle(frame_out, (x1, y1), (x2, y2), (0, 0, 255), 2)
-                cv2.putText(frame_out, f"TEHLIKE: {class_name.upper()}!", (50, 50),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 255), 3)
-                if USER_SETTINGS["alarm_enabled"]:
-                    play_alert(USER_SETTINGS["alarm_path"],
-                                       duration=2,
-                                       volume=USER_SETTINGS["alarm_volume"])
-                danger_detected = True
-                if LOGGING_ENABLED:
-                    print(f"Frame: {frame_count}")
-                    print(f"⚠️ Alarm - ID: {obj_id}, Reason: {reason}")
-
-
-        # Silinen objeleri temizle
-        lost_ids = [oid for oid in tracked_objects if oid not in current_ids]
-        for oid in lost_ids:
-            del tracked_objects[oid]
-
-        if not danger_detected:
-            cv2.putText(frame_out, "Sistem Calisiyor - Tehlike Yok", (50, 50),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-
-        cv2.imshow("Yapay Zeka ile Nesne ve Tehlike Tespiti Sistemi", frame_out)
-
-        if fbf_enabled:
-            cv2.putText(frame_out, "Sonraki frame'e gecmek icin Enter'a basin",
-                        (frame_out.shape[1] - 480, frame_out.shape[0] - 5),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 200), 2)
-            key = cv2.waitKey(0)
-        else:
-            key = cv2.waitKey(1)
-
-        cv2.putText(frame_out, "Cikmak icin Q'ya basin", (frame_out.shape[1] - 350, frame_out.shape[0] - 30),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 200), 2)
-
-        if key & 0xFF in [ord("q"), ord("Q")]:
-            break
-    cap.release()
-    cv2.destroyAllWindows()
+            cv2.imshow(window, frame_out)
+            key = cv2.waitKey(0) if fbf_enabled else cv2.waitKey(1)
+            profiler.mark("display")
+
+            if key & 0xFF in [ord("q"), ord("Q")]:
+                break
+            if key & 0xFF in [ord("p"), ord("P")]:
+                profiler.capture()
+    finally:
+        profiler.close()
+        for alert in alert_manager.close(frame_count):
+            handle_alert(alert)
+        if release_capture:
+            cap.release()
+        if reviewer is not None:
+            reviewer.close()
+            pool.trim()
+        if not headless:
+            cv2.destroyAllWindows()
+        if stream is not None:
+            stream.stop()
+        if events is not None:
+            for oid, summary in track_summary.items():
+                obj = tracks.objects.get(oid)
+                events.log_track(session_id, oid, obj.cls_name if obj else None, *summary)
+            events.end_session(session_id, frame_count)
+            events.close()
+
+    if LOGGING_ENABLED:
+        stats = renderer.stats()
+        print(f"Overlay: {stats['frames']} frame, {stats['refreshes']} yenileme, ort. {stats['avg_ms']:.2f} ms")
+        print(f"Bölge testi: {zone_totals['culled']} elendi, {zone_totals['evaluated']} değerlendirildi")
+        if profiler.enabled:
+            p = profiler.stats()
+            stages = ", ".join(f"{k} {v:.1f}" for k, v in p["stage_avg_ms"].items())
+            print(f"Profil: {p['slow_frames']} yavaş kare, {p['dumps']} döküm, en uzun {p['max_ms']:.1f} ms; "
+                  f"ort. ms: {stages}")
+        f = pool.stats()
+        print(f"Kare havuzu: {f['buffers']} tampon ({f['mb']:.1f} MB, {f['held']} tutulan), {f['allocations']} ayırma "
+              f"({f['allocated_mb']:.1f} MB), kare başına {f['per_frame']:.3f}, ısınma sonrası "
+              f"{f['steady_per_frame']:.3f}, {f['fallbacks']} yedek ayırma")
+        if tiler is not None:
+            t = tiler.stats()
+            print(f"Karolu çıkarım: {t['tiles']} karo, kare başına ort. {t['avg_run']:.1f} çalıştı / "
+                  f"{t['avg_skipped']:.1f} atlandı, {t['ms_per_frame']:.1f} ms (çıkarım {t['infer_ms_per_frame']:.1f} ms)")
+        c = alert_manager.counts
+        print(f"Alarm: {c['start']} tehlike ({c['update']} güncelleme), {c['danger_frames']} tehlikeli kare")
+        if reviewer is not None:
+            r = reviewer.cache.stats()
+            print(f"İnceleme önbelleği: {r['frames']} kare ({r['mb']:.0f} MB), {r['checkpoints']} kontrol noktası, "
+                  f"{r['hits']} isabet, {r['misses']} ıskalama, {r['replayed_frames']} kare yeniden oynatıldı")
+        if gate is not None:
+            g = gate.stats()
+            print(f"Hareket kapısı: {g['skipped']}/{g['frames']} kare atlandı (%{g['skip_ratio'] * 100:.1f}), "
+                  f"kapı ort. {g['gate_ms']:.2f} ms, kazanılan ~{g['saved_s']:.1f} s, zorlanan {g['forced']}")
@@ -0,0 +1,279 @@
+"""
+Local SQLite event store for danger events, track summaries and sessions.
+
+Writes go through a background thread that commits in batches, so the
+detection loop only pays for a queue put. The database runs in WAL mode
+so the query CLI can read while a session is recording.
+
+    python event_store.py query --class person --since 7d --per-track
+    python event_store.py sessions
+"""
+import argparse
+import json
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    source TEXT,
+    model TEXT,
+    config TEXT,
+    frames INTEGER
+);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    frame INTEGER,
+    track_id INTEGER,
+    cls TEXT,
+    reason TEXT,
+    zone TEXT,
+    severity INTEGER,
+    ttc REAL,
+    x1 REAL, y1 REAL, x2 REAL, y2 REAL,
+    kind TEXT,
+    hazard INTEGER,
+    duration_frames INTEGER
+);
+CREATE TABLE IF NOT EXISTS tracks (
+    session_id TEXT NOT NULL,
+    track_id INTEGER NOT NULL,
+    cls TEXT,
+    first_ts REAL,
+    last_ts REAL,
+    frames INTEGER,
+    danger_frames INTEGER,
+    PRIMARY KEY (session_id, track_id)
+);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS idx_events_cls_ts ON events (cls, ts);
+CREATE INDEX IF NOT EXISTS idx_events_reason_ts ON events (reason, ts);
+CREATE INDEX IF NOT EXISTS idx_events_session ON events (session_id, track_id);
+CREATE INDEX IF NOT EXISTS idx_tracks_cls_ts ON tracks (cls, first_ts);
+"""
+
+_EVENT_SQL = ("INSERT INTO events (session_id, ts, frame, track_id, cls, reason, zone, severity, ttc, "
+              "x1, y1, x2, y2, kind, hazard, duration_frames) "
+              "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+# Columns added after the first schema; older databases get them on connect
+_ADDED_COLUMNS = [("events", "kind", "TEXT"), ("events", "hazard", "INTEGER"),
+                  ("events", "duration_frames", "INTEGER")]
+_TRACK_SQL = ("INSERT OR REPLACE INTO tracks (session_id, track_id, cls, first_ts, last_ts, frames, "
+              "danger_frames) VALUES (?, ?, ?, ?, ?, ?, ?)")
+_SESSION_START_SQL = "INSERT INTO sessions (id, started_at, source, model, config) VALUES (?, ?, ?, ?, ?)"
+_SESSION_END_SQL = "UPDATE sessions SET ended_at = ?, frames = ? WHERE id = ?"
+
+_STOP = object()
+
+
+def connect(path):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    for table, column, kind in _ADDED_COLUMNS:
+        if column not in {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {kind}")
+    return conn
+
+
+class EventStore:
+    """
+    Batched, background-writing front end to the SQLite event database.
+
+    All log_* methods only enqueue a row; the writer thread groups rows into
+    one transaction per `batch_size` rows or `flush_interval` seconds.
+    """
+
+    def __init__(self, path="events.db", batch_size=500, flush_interval=1.0, max_queue=100000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._writer, daemon=True)
+        self._thread.start()
+
+    def _put(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            # Never block the detection loop on disk I/O
+            self.dropped += 1
+
+    def start_session(self, source, config, model):
+        session_id = uuid.uuid4().hex
+        self._put((_SESSION_START_SQL, (session_id, time.time(), str(source), str(model),
+                                        json.dumps(config, default=str))))
+        return session_id
+
+    def end_session(self, session_id, frames):
+        self._put((_SESSION_END_SQL, (time.time(), frames, session_id)))
+
+    def log_event(self, session_id, frame, track_id, cls, reason, zone=None, severity=None, ttc=None,
+                  box=(None, None, None, None), ts=None, kind=None, hazard=None, duration_frames=None):
+        self._put((_EVENT_SQL, (session_id, ts or time.time(), frame, track_id, cls, reason, zone,
+                                severity, ttc, *box, kind, hazard, duration_frames)))
+
+    def log_track(self, session_id, track_id, cls, first_ts, last_ts, frames, danger_frames):
+        self._put((_TRACK_SQL, (session_id, track_id, cls, first_ts, last_ts, frames, danger_frames)))
+
+    def close(self, timeout=5.0):
+        # Yazıcı iş parçacığı ölmüşse kuyruk hiç boşalmaz; durdurma işareti beklenmez
+        if not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            print(f"[EVENT STORE] Kuyruk {timeout:.0f} s içinde boşalmadı, kapatma bekletilmiyor")
+            return
+        self._thread.join()
+
+    def _writer(self):
+        conn = connect(self.path)
+        stop = False
+        while not stop:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            if batch:
+                self._write_batch(conn, batch)
+        conn.close()
+
+    @staticmethod
+    def _write_batch(conn, batch):
+        try:
+            with conn:
+                # Consecutive rows of the same statement go through one executemany
+                i = 0
+                while i < len(batch):
+                    sql = batch[i][0]
+                    j = i
+                    while j < len(batch) and batch[j][0] == sql:
+                        j += 1
+                    conn.executemany(sql, [params for _, params in batch[i:j]])
+                    i = j
+        except sqlite3.Error as e:
+            print(f"[EVENT STORE ERROR] {e}")
+
+
+def parse_since(text):
+    """'7d', '12h', '30m' or '45s' to a unix timestamp that many units ago."""
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+    if text[-1] in units:
+        return time.time() - float(text[:-1]) * units[text[-1]]
+    return time.time() - float(text)
+
+
+def query_events(conn, cls=None, since=None, until=None, reason=None, zone=None, max_ttc=None,
+                 per_track=False, limit=100, kind=None):
+    where, params = [], []
+    if kind:
+        where.append("kind = ?")
+        params.append(kind)
+    if cls:
+        where.append("cls = ?")
+        params.append(cls)
+    if since is not None:
+        where.append("ts >= ?")
+        params.append(since)
+    if until is not None:
+        where.append("ts < ?")
+        params.append(until)
+    if reason:
+        where.append("reason = ?")
+        params.append(reason)
+    if zone:
+        where.append("zone = ?")
+        params.append(zone)
+    if max_ttc is not None:
+        where.append("ttc <= ?")
+        params.append(max_ttc)
+    clause = f"WHERE {' AND '.join(where)}" if where else ""
+
+    if per_track:
+        # One row per hazard; its length is the first to last dangerous frame stored on the
+        # events (the end event comes after the exit and cooldown frames). Rows written
+        # before duration_frames existed fall back to the span of their event frames.
+        sql = (f"SELECT session_id, track_id, hazard, cls, MIN(ts), MAX(ts), "
+               f"COALESCE(MAX(duration_frames), MAX(frame) - MIN(frame) + 1), MIN(ttc), MAX(severity) "
+               f"FROM events {clause} GROUP BY session_id, track_id, hazard ORDER BY MIN(ts) DESC LIMIT ?")
+    else:
+        sql = (f"SELECT session_id, ts, frame, track_id, cls, reason, zone, severity, ttc, kind "
+               f"FROM events {clause} ORDER BY ts DESC LIMIT ?")
+    return conn.execute(sql, (*params, limit)).fetchall()
+
+
+def _fmt_ts(ts):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Danger event store queries")
+    parser.add_argument("--db", default="events.db")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    q = sub.add_parser("query", help="list danger events")
+    q.add_argument("--class", dest="cls")
+    q.add_argument("--since", help="e.g. 7d, 12h, 30m")
+    q.add_argument("--reason")
+    q.add_argument("--zone")
+    q.add_argument("--max-ttc", type=float, help="only events with TTC <= this many seconds")
+    q.add_argument("--kind", choices=["start", "update", "end"], help="alert event type")
+    q.add_argument("--per-track", action="store_true", help="one row per hazard")
+    q.add_argument("--limit", type=int, default=100)
+
+    sub.add_parser("sessions", help="list recorded sessions")
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db)
+    if args.command == "sessions":
+        rows = conn.execute("SELECT id, started_at, ended_at, source, model, frames FROM sessions "
+                            "ORDER BY started_at DESC").fetchall()
+        for sid, start, end, source, model, frames in rows:
+            end_text = _fmt_ts(end) if end else "-"
+            print(f"{sid}  {_fmt_ts(start)} -> {end_text}  {frames or 0} kare  {source}  {model}")
+        return 0
+
+    t0 = time.perf_counter()
+    rows = query_events(conn, args.cls, parse_since(args.since) if args.since else None, None,
+                        args.reason, args.zone, args.max_ttc, args.per_track, args.limit, args.kind)
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+
+    for row in rows:
+        if args.per_track:
+            sid, track_id, hazard, cls, first, last, n, min_ttc, severity = row
+            ttc_text = f"{min_ttc:.2f}s" if min_ttc is not None else "-"
+            hazard_text = f"#{hazard}" if hazard is not None else "-"
+            print(f"{_fmt_ts(first)}  {sid[:8]}  ID {track_id:<6} {hazard_text:<5} {cls:<10} {n:5d} kare  "
+                  f"min TTC {ttc_text}  seviye {severity}")
+        else:
+            sid, ts, frame, track_id, cls, reason, zone, severity, ttc, kind = row
+            ttc_text = f"{ttc:.2f}s" if ttc is not None else "-"
+            print(f"{_fmt_ts(ts)}  {sid[:8]}  kare {frame:<7} ID {track_id:<6} {cls:<10} {kind or '-':<6} "
+                  f"{zone or '-'}:{reason}  TTC {ttc_text}")
+    print(f"{len(rows)} satır, {elapsed_ms:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+import bisect
+import json
+import os
+import struct
+
+import cv2
+
+INDEX_SUFFIX = ".frameidx.json"
+INDEX_VERSION = 1
+
+_CONTAINER_BOXES = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+
+
+class FrameIndex:
+    """
+    Per-file frame index: frame count, keyframe positions and timestamps.
+
+    Timestamps are stored run-length encoded (like the MP4 `stts` table) so
+    the index of a multi-hour recording stays small on disk.
+    """
+
+    def __init__(self, frame_count, timescale, time_runs, keyframes, fps):
+        self.frame_count = frame_count
+        self.timescale = timescale
+        self.time_runs = time_runs  # [[sample_count, delta], ...]
+        self.keyframes = keyframes  # sorted 0-based frame numbers, empty if unknown
+        self.fps = fps
+
+    def nearest_keyframe(self, frame_no):
+        """Return the last keyframe at or before frame_no (0 if unknown)."""
+        if not self.keyframes:
+            return 0
+        i = bisect.bisect_right(self.keyframes, frame_no) - 1
+        return self.keyframes[max(i, 0)]
+
+    def to_dict(self):
+        return {
+            "version": INDEX_VERSION,
+            "frame_count": self.frame_count,
+            "timescale": self.timescale,
+            "time_runs": self.time_runs,
+            "keyframes": self.keyframes,
+            "fps": self.fps,
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["frame_count"], d["timescale"], d["time_runs"], d["keyframes"], d["fps"])
+
+
+def _iter_boxes(data, start, end):
+    """Yield (type, payload_start, box_end) for ISO-BMFF boxes in data[start:end]."""
+    pos = start
+    while pos + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", data, pos)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", data, pos + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header:
+            return
+        yield box_type, pos + header, min(pos + size, end)
+        pos += size
+
+
+def _read_moov(path):
+    """Read the top-level moov box of an MP4/MOV file, or None."""
+    with open(path, "rb") as f:
+        file_size = os.fstat(f.fileno()).st_size
+        pos = 0
+        while pos + 8 <= file_size:
+            f.seek(pos)
+            head = f.read(16)
+            size, box_type = struct.unpack_from(">I4s", head, 0)
+            header = 8
+            if size == 1:
+                size = struct.unpack_from(">Q", head, 8)[0]
+                header = 16
+            elif size == 0:
+                size = file_size - pos
+            if size < header:
+                return None
+            if box_type == b"moov":
+                f.seek(pos)
+                return f.read(size)
+            pos += size
+    return None
+
+
+def _parse_video_track(moov):
+    """Extract timescale, stts runs, keyframes and sample count of the first video track."""
+    tables = {}
+
+    def walk(start, end, track):
+        for box_type, payload, box_end in _iter_boxes(moov, start, end):
+            if box_type == b"trak":
+                track = {}
+                walk(payload, box_end, track)
+                if track.get("handler") == b"vide" and "sample_count" in track and not tables:
+                    tables.update(track)
+            elif box_type in _CONTAINER_BOXES:
+                walk(payload, box_end, track)
+            elif track is None:
+                continue
+            elif box_type == b"hdlr":
+                track["handler"] = moov[payload + 8:payload + 12]
+            elif box_type == b"mdhd":
+                if moov[payload] == 1:
+                    track["timescale"] = struct.unpack_from(">I", moov, payload + 20)[0]
+                else:
+                    track["timescale"] = struct.unpack_from(">I", moov, payload + 12)[0]
+            elif box_type == b"stts":
+                n = struct.unpack_from(">I", moov, payload + 4)[0]
+                flat = struct.unpack_from(f">{2 * n}I", moov, payload + 8)
+                track["time_runs"] = [[flat[i], flat[i + 1]] for i in range(0, 2 * n, 2)]
+            elif box_type == b"stss":
+                n = struct.unpack_from(">I", moov, payload + 4)[0]
+                track["keyframes"] = [s - 1 for s in struct.unpack_from(f">{n}I", moov, payload + 8)]
+            elif box_type == b"stsz":
+                track["sample_count"] = struct.unpack_from(">I", moov, payload + 8)[0]
+
+    walk(8, len(moov), None)
+    return tables or None
+
+
+def _build_from_container(path):
+    try:
+        moov = _read_moov(path)
+    except (OSError, struct.error):
+        return None
+    if moov is None:
+        return None
+    try:
+        track = _parse_video_track(moov)
+    except struct.error:
+        return None
+    if not track or not track.get("timescale"):
+        return None
+
+    frame_count = track["sample_count"]
+    if not frame_count:
+        # Fragmented MP4: samples live in moof boxes, the moov tables are empty
+        return None
+    time_runs = track.get("time_runs", [])
+    total_ticks = sum(c * d for c, d in time_runs)
+    fps = frame_count * track["timescale"] / total_ticks if total_ticks else 0.0
+    keyframes = track.get("keyframes")
+    if keyframes is None:
+        # No stss box means every sample is a sync sample
+        keyframes = list(range(frame_count)) if frame_count < 1_000_000 else []
+    return FrameIndex(frame_count, track["timescale"], time_runs, keyframes, fps)
+
+
+def _build_by_scanning(path):
+    """Fallback: count frames with grab() only (no retrieve/colour conversion)."""
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+    frame_count = 0
+    while cap.grab():
+        frame_count += 1
+    cap.release()
+    return FrameIndex(frame_count, 1000, [], [], fps)
+
+
+def load_frame_index(video_path):
+    """Load the cached index beside the video, building and caching it if stale."""
+    stat = os.stat(video_path)
+    cache_path = video_path + INDEX_SUFFIX
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, "r") as f:
+                cached = json.load(f)
+            if (cached.get("version") == INDEX_VERSION and cached.get("size") == stat.st_size
+                    and cached.get("mtime") == stat.st_mtime and cached.get("frame_count")):
+                return FrameIndex.from_dict(cached)
+        except (OSError, ValueError, KeyError):
+            pass
+
+    index = _build_from_container(video_path) or _build_by_scanning(video_path)
+
+    data = index.to_dict()
+    data.update({"size": stat.st_size, "mtime": stat.st_mtime})
+    try:
+        with open(cache_path, "w") as f:
+            json.dump(data, f)
+    except OSError as e:
+        print(f"[INDEX] Index kaydedilemedi: {e}")
+    return index
+
+
+def skip_frames(cap, n):
+    """Advance n frames using grab() only; returns the number actually skipped."""
+    skipped = 0
+    while skipped < n and cap.grab():
+        skipped += 1
+    return skipped
+
+
+def seek(cap, index, frame_no):
+    """
+    Position cap so that the next read() returns frame_no.
+
+    Seeks to the nearest preceding keyframe, which the backend can land on
+    exactly, then grabs forward to the target. Falls back to rewinding and
+    grabbing from the start if the backend lands somewhere else.
+    """
+    frame_no = max(0, min(frame_no, max(index.frame_count - 1, 0)))
+    keyframe = index.nearest_keyframe(frame_no)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, keyframe)
+    if int(cap.get(cv2.CAP_PROP_POS_FRAMES)) != keyframe:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        keyframe = 0
+    return skip_frames(cap, frame_no - keyframe) == frame_no - keyframe
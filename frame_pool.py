@@ -0,0 +1,174 @@
+import cv2
+import numpy as np
+
+
+class PooledBuffer:
+    __slots__ = ("role", "array", "owner")
+
+    def __init__(self, role, array):
+        self.role = role
+        self.array = array
+        self.owner = None
+
+
+class FramePool:
+    """
+    Preallocated frame buffers for the capture -> resize -> render chain.
+
+    Buffers are handed out per role ("read", "resize", ...) and keep an
+    owner until released. Buffers acquired for the current frame are owned
+    by "frame" and all come back with next_frame(); a stage that keeps an
+    image across frames takes it over with hold() and gives it back with
+    release(), so the pool never hands a buffer in use to the capture.
+
+    Every array the pool had to create, or that a capture or resize
+    returned instead of filling the offered buffer, counts as an
+    allocation. After the first frame (and after a resolution change) a
+    steady loop should report none; a role with more than `depth` buffers
+    owned at once means a stage is not giving them back.
+    """
+
+    FRAME = "frame"
+
+    def __init__(self, depth=2):
+        self.depth = max(1, depth)
+        self._roles = {}
+        self._by_id = {}
+        self._warned = set()
+
+        self.frames = 0
+        self.allocations = 0
+        self.allocated_bytes = 0
+        self.warmup_allocations = 0
+        self.fallbacks = 0
+
+    def reset_stats(self):
+        """Start counting from zero while keeping the buffers (e.g. for a new run)."""
+        self.frames = 0
+        self.allocations = 0
+        self.allocated_bytes = 0
+        self.warmup_allocations = 0
+        self.fallbacks = 0
+
+    def _new(self, role, array):
+        slot = PooledBuffer(role, array)
+        self._roles.setdefault(role, []).append(slot)
+        self._by_id[id(array)] = slot
+        self.allocations += 1
+        self.allocated_bytes += array.nbytes
+        if self.frames <= 1:
+            self.warmup_allocations += 1
+        return slot
+
+    def _drop(self, slot):
+        self._roles[slot.role].remove(slot)
+        del self._by_id[id(slot.array)]
+
+    def acquire(self, role, shape, dtype=np.uint8, owner=FRAME):
+        """A free buffer of `shape` for `role`, owned by `owner`."""
+        slots = self._roles.get(role, [])
+        for slot in slots:
+            if slot.owner is None and slot.array.shape == shape and slot.array.dtype == dtype:
+                slot.owner = owner
+                return slot.array
+        # Çözünürlük değiştiyse eski boş tamponlar bırakılır
+        for slot in [s for s in slots if s.owner is None]:
+            self._drop(slot)
+        # hold() ile devredilen tamponlar sayılmaz; yalnızca kare içinde bırakılmayanlar
+        in_frame = sum(s.owner == self.FRAME for s in slots)
+        if in_frame >= self.depth and role not in self._warned:
+            self._warned.add(role)
+            print(f"[POOL] '{role}' için {in_frame} tampon hâlâ kullanımda, yeni tampon ayrılıyor")
+        slot = self._new(role, np.empty(shape, dtype=dtype))
+        slot.owner = owner
+        return slot.array
+
+    def adopt(self, role, array, owner=FRAME):
+        """Take an array allocated elsewhere (e.g. by the capture) into the pool."""
+        slot = self._by_id.get(id(array)) or self._new(role, array)
+        slot.owner = owner
+        return array
+
+    def _replace(self, offered, role, array):
+        # Kaynak sunulan tamponu kullanmadı: yerine döndürdüğü dizi geçer
+        self._drop(self._by_id[id(offered)])
+        self.fallbacks += 1
+        return self.adopt(role, array)
+
+    def owner(self, array):
+        slot = self._by_id.get(id(array))
+        return slot.owner if slot is not None else None
+
+    def hold(self, array, owner):
+        """
+        Hand a frame buffer over to a stage that keeps it past this frame.
+        Returns False if the array is not a pool buffer owned by the current
+        frame; the caller then has to copy it.
+        """
+        slot = self._by_id.get(id(array))
+        if slot is None or slot.owner != self.FRAME:
+            return False
+        slot.owner = owner
+        return True
+
+    def release(self, array):
+        """Return a buffer to the pool; arrays the pool does not know are ignored."""
+        slot = self._by_id.get(id(array))
+        if slot is not None:
+            slot.owner = None
+
+    def next_frame(self):
+        """Release every buffer the previous frame still owns."""
+        self.frames += 1
+        for slots in self._roles.values():
+            for slot in slots:
+                if slot.owner == self.FRAME:
+                    slot.owner = None
+
+    def trim(self):
+        """Drop free buffers beyond `depth` per role (e.g. after review gave many back)."""
+        for slots in self._roles.values():
+            free = [s for s in slots if s.owner is None]
+            for slot in free[self.depth:]:
+                self._drop(slot)
+
+    def read(self, cap):
+        """cap.read() into a pooled buffer; the first frame fixes the size."""
+        shape = self._last_shape("read")
+        if shape is None:
+            ret, frame = cap.read()
+            return ret, self.adopt("read", frame) if ret else frame
+        buf = self.acquire("read", shape)
+        ret, frame = cap.read(image=buf)
+        if not ret:
+            self.release(buf)
+        elif frame is not buf:
+            self._replace(buf, "read", frame)
+        return ret, frame
+
+    def resize(self, frame, size, interpolation=cv2.INTER_LINEAR):
+        """cv2.resize into a pooled buffer of (width, height) `size`."""
+        w, h = size
+        buf = self.acquire("resize", (h, w) + frame.shape[2:], frame.dtype)
+        out = cv2.resize(frame, size, dst=buf, interpolation=interpolation)
+        if out is not buf:
+            self._replace(buf, "resize", out)
+        return out
+
+    def _last_shape(self, role):
+        slots = self._roles.get(role)
+        return slots[-1].array.shape if slots else None
+
+    def stats(self):
+        steady = self.allocations - self.warmup_allocations
+        steady_frames = max(self.frames - 1, 1)
+        return {
+            "buffers": len(self._by_id),
+            "held": sum(s.owner not in (None, self.FRAME) for s in self._by_id.values()),
+            "mb": sum(s.array.nbytes for s in self._by_id.values()) / (1024 * 1024),
+            "allocations": self.allocations,
+            "allocated_mb": self.allocated_bytes / (1024 * 1024),
+            "per_frame": self.allocations / self.frames if self.frames else 0.0,
+            "steady_per_frame": steady / steady_frames,
+            "fallbacks": self.fallbacks,
+        }
@@ -0,0 +1,212 @@
+"""
+Opt-in profiler for stutter in the detection loop.
+
+Every frame's stage timings go into a ring buffer. While profiling is on,
+a background thread samples the detection thread's Python stack every few
+milliseconds; the samples of the current frame are kept until the frame
+ends. A frame over the budget gets its stack samples (collapsed, flame
+graph format) and the surrounding timing window written to disk, without
+paying for a tracing profiler on every frame. capture(n) runs cProfile on
+the next n frames and writes a .prof plus a text summary.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+
+class StackSampler:
+    """Samples one thread's stack at a fixed interval from a helper thread."""
+
+    def __init__(self, thread_id, interval=0.005, max_depth=64):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def take(self):
+        """Return and reset the samples gathered since the last call."""
+        samples, self.samples = self.samples, []
+        return samples
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.samples.append(";".join(reversed(stack)))
+
+
+class FrameProfiler:
+    """
+    Per-stage frame timings with slow-frame dumps and on-demand captures.
+
+    Call begin_frame() at the top of each loop iteration and mark(stage)
+    after each stage; the time since the previous mark is booked to that
+    stage. begin_frame() also closes the previous frame, so early
+    `continue`s need no extra call. With enabled=False every method returns
+    immediately.
+    """
+
+    def __init__(self, enabled=False, budget_ms=100.0, window=120, out_dir="profiles", capture_frames=30,
+                 sample_ms=5.0, max_dumps=20):
+        self.enabled = enabled
+        self.budget_ms = budget_ms
+        self.out_dir = out_dir
+        self.capture_frames = capture_frames
+        self.max_dumps = max_dumps
+        self.ring = deque(maxlen=window)
+        self.slow_frames = 0
+        self.dumps = 0
+        self.max_ms = 0.0
+
+        self._frame_no = None
+        self._t_start = 0.0
+        self._t_last = 0.0
+        self._stages = {}
+        self._pending = []
+        self._last_dump = None
+        self._capture_left = 0
+        self._capture_start = None
+        self._profile = None
+        self._sampler = None
+        self._session = time.strftime("%Y%m%d_%H%M%S")
+        if enabled:
+            self._sampler = StackSampler(threading.get_ident(), sample_ms / 1000)
+            self._sampler.start()
+
+    def begin_frame(self, frame_no):
+        if not self.enabled:
+            return
+        self._finish_frame()
+        if self._capture_left and self._profile is None:
+            self._profile = cProfile.Profile()
+            self._capture_start = frame_no
+            self._profile.enable()
+        self._frame_no = frame_no
+        self._t_start = self._t_last = time.perf_counter()
+        self._stages = {}
+        self._sampler.take()
+
+    def mark(self, stage):
+        if not self.enabled or self._frame_no is None:
+            return
+        now = time.perf_counter()
+        self._stages[stage] = self._stages.get(stage, 0.0) + (now - self._t_last) * 1000
+        self._t_last = now
+
+    def capture(self, n=None):
+        """Run cProfile over the next n frames (capture_frames by default)."""
+        if self.enabled and not self._capture_left:
+            self._capture_left = n or self.capture_frames
+            print(f"[PROFILE] Sonraki {self._capture_left} kare profilleniyor")
+
+    def _finish_frame(self):
+        if self._frame_no is None:
+            return
+        total = (time.perf_counter() - self._t_start) * 1000
+        record = {"frame": self._frame_no, "total_ms": round(total, 3),
+                  "stages": {k: round(v, 3) for k, v in self._stages.items()}}
+        self.ring.append(record)
+        self.max_ms = max(self.max_ms, total)
+        samples = self._sampler.take()
+
+        if self._profile is not None:
+            self._capture_left -= 1
+            if not self._capture_left:
+                self._dump_capture()
+
+        # Slow frame dumps wait until half a window of frames after it is known
+        if total > self.budget_ms:
+            self.slow_frames += 1
+            gap = self.ring.maxlen // 2
+            if (self.dumps + len(self._pending) < self.max_dumps
+                    and (self._last_dump is None or self._frame_no - self._last_dump >= gap)):
+                self._last_dump = self._frame_no
+                self._pending.append((record, samples))
+        self._flush_pending(force=False)
+        self._frame_no = None
+
+    def _flush_pending(self, force):
+        while self._pending:
+            record, samples = self._pending[0]
+            if not force and self.ring[-1]["frame"] - record["frame"] < self.ring.maxlen // 2:
+                break
+            self._pending.pop(0)
+            self._dump_slow(record, samples)
+
+    def _path(self, name):
+        os.makedirs(self.out_dir, exist_ok=True)
+        return os.path.join(self.out_dir, f"{self._session}_{name}")
+
+    def _dump_slow(self, record, samples):
+        folded = Counter(samples)
+        leaf = Counter(s.rsplit(";", 1)[-1] for s in samples)
+        data = {
+            "frame": record["frame"], "budget_ms": self.budget_ms, "total_ms": record["total_ms"],
+            "stages": record["stages"], "sample_count": len(samples),
+            "top_self": leaf.most_common(15),
+            "stacks": dict(folded.most_common()),
+            "window": [r for r in self.ring if abs(r["frame"] - record["frame"]) <= self.ring.maxlen // 2],
+        }
+        path = self._path(f"slow_{record['frame']}.json")
+        try:
+            with open(path, "w") as f:
+                json.dump(data, f, indent=1)
+            self.dumps += 1
+            print(f"[PROFILE] Yavaş kare {record['frame']} ({record['total_ms']:.1f} ms) -> {path}")
+        except OSError as e:
+            print(f"[PROFILE] Yazılamadı: {e}")
+
+    def _dump_capture(self):
+        self._profile.disable()
+        path = self._path(f"capture_{self._capture_start}.prof")
+        try:
+            self._profile.dump_stats(path)
+            text = io.StringIO()
+            pstats.Stats(self._profile, stream=text).sort_stats("cumulative").print_stats(40)
+            with open(path[:-5] + ".txt", "w") as f:
+                f.write(text.getvalue())
+            print(f"[PROFILE] Kare {self._capture_start}-{self.ring[-1]['frame']} profili -> {path}")
+        except OSError as e:
+            print(f"[PROFILE] Yazılamadı: {e}")
+        self._profile = None
+
+    def close(self):
+        if not self.enabled:
+            return
+        self._finish_frame()
+        if self._profile is not None:
+            self._capture_left = 0
+            self._dump_capture()
+        self._flush_pending(force=True)
+        self._sampler.stop()
+
+    def stats(self):
+        stage_ms = Counter()
+        for r in self.ring:
+            stage_ms.update(r["stages"])
+        n = len(self.ring) or 1
+        return {
+            "slow_frames": self.slow_frames,
+            "dumps": self.dumps,
+            "max_ms": self.max_ms,
+            "stage_avg_ms": {k: v / n for k, v in stage_ms.items()},
+        }
@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 
 def line_intersects_box(start_point, end_point, box):
     """
@@ -247,4 +249,110 @@ def distance_point_to_line(point, line_start, line_end):
     closest_y = y1 + t * (y2 - y1)
 
     # Return distance
-    return math.sqrt((px - closest_x) ** 2 + (py - closest_y) ** 2)
\ No newline at end of file
+    return math.sqrt((px - closest_x) ** 2 + (py - closest_y) ** 2)
+
+def get_named_zones(frame_w, frame_h, zone_specs, crash_box):
+    """
+    Build (name, severity, box) tuples for the configured crash zones.
+
+    Each spec is a dict with "name", "severity" and frame-relative ratios
+    "x1", "y1", "x2", "y2". The calibrated crash box is always included as
+    a zone named "crash", ranked as severe as the most severe spec.
+    """
+    zones = []
+    for spec in zone_specs or ():
+        box = (int(spec["x1"] * frame_w), int(spec["y1"] * frame_h),
+               int(spec["x2"] * frame_w), int(spec["y2"] * frame_h))
+        zones.append((spec.get("name", f"zone_{len(zones)}"), int(spec.get("severity", 1)), box))
+    severity = max((z[1] for z in zones), default=1)
+    return [("crash", severity, tuple(crash_box))] + zones
+
+
+def boxes_overlap(a, b):
+    """Check if two (x1, y1, x2, y2) boxes overlap (touching counts)."""
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+
+def swept_box_time_to_overlap(box, edge_velocity, zone, horizon_frames):
+    """
+    Closed-form (slab) time until a moving box first overlaps a zone.
+
+    Each box edge moves linearly with `edge_velocity` (dx1, dy1, dx2, dy2 per
+    frame), so growing/shrinking boxes are handled too. Overlap on an axis
+    is two linear inequalities in t; intersecting the four resulting
+    half-lines with [0, horizon_frames] gives the first overlap time.
+
+    Returns:
+        Time in frames (0 if already overlapping), or None if the box does
+        not reach the zone within horizon_frames.
+    """
+    x1, y1, x2, y2 = box
+    vx1, vy1, vx2, vy2 = edge_velocity
+    zx1, zy1, zx2, zy2 = zone
+
+    t_enter, t_exit = 0.0, float(horizon_frames)
+    # Each constraint is a + b * t >= 0
+    for a, b in ((x2 - zx1, vx2), (zx2 - x1, -vx1), (y2 - zy1, vy2), (zy2 - y1, -vy1)):
+        if b == 0:
+            if a < 0:
+                return None
+        elif b > 0:
+            t_enter = max(t_enter, -a / b)
+        else:
+            t_exit = min(t_exit, -a / b)
+        if t_enter > t_exit:
+            return None
+    return t_enter
+
+
+def swept_box_entry_edge(box, edge_velocity, zone):
+    """
+    Name of the object edge that reaches the zone last, i.e. the one that
+    completes the first overlap found by swept_box_time_to_overlap.
+
+    Returns "left_edge" / "right_edge" / "top_edge" / "bottom_edge", or None
+    if the box already overlaps the zone.
+    """
+    x1, y1, x2, y2 = box
+    vx1, vy1, vx2, vy2 = edge_velocity
+    zx1, zy1, zx2, zy2 = zone
+
+    edge, t_enter = None, 0.0
+    for name, a, b in (("right_edge", x2 - zx1, vx2), ("left_edge", zx2 - x1, -vx1),
+                       ("bottom_edge", y2 - zy1, vy2), ("top_edge", zy2 - y1, -vy1)):
+        if b > 0 and -a / b > t_enter:
+            edge, t_enter = name, -a / b
+    return edge
+
+
+def swept_boxes_time_to_overlap(boxes, edge_velocities, zone, horizon_frames):
+    """
+    Vectorized swept_box_time_to_overlap for N boxes at once.
+
+    Args:
+        boxes: (N, 4) array of x1, y1, x2, y2
+        edge_velocities: (N, 4) array of dx1, dy1, dx2, dy2 per frame
+        zone: (x1, y1, x2, y2)
+        horizon_frames: prediction horizon in frames (scalar or (N,))
+
+    Returns:
+        (N,) float array of first-overlap times in frames, inf where the
+        zone is not reached within the horizon.
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    v = np.asarray(edge_velocities, dtype=np.float64).reshape(-1, 4)
+    zx1, zy1, zx2, zy2 = (float(c) for c in zone)
+
+    a = np.stack((boxes[:, 2] - zx1, zx2 - boxes[:, 0], boxes[:, 3] - zy1, zy2 - boxes[:, 1]), axis=1)
+    b = np.stack((v[:, 2], -v[:, 0], v[:, 3], -v[:, 1]), axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = -a / b
+    lower = np.where(b > 0, t, -np.inf)
+    upper = np.where(b < 0, t, np.inf)
+    infeasible = ((b == 0) & (a < 0)).any(axis=1)
+
+    t_enter = np.maximum(lower.max(axis=1), 0.0)
+    t_exit = np.minimum(upper.min(axis=1), horizon_frames)
+    return np.where(~infeasible & (t_enter <= t_exit), t_enter, np.inf)
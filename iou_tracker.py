@@ -0,0 +1,135 @@
+import numpy as np
+
+
+def iou_matrix(a, b):
+    """Pairwise IoU of (N, 4) and (M, 4) xyxy box arrays."""
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 4)
+    ix1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    iy1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    ix2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    iy2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+def _greedy_assignment(score, threshold):
+    """Highest-IoU-first matching; returns (rows, cols)."""
+    rows, cols = [], []
+    if score.size == 0:
+        return rows, cols
+    order = np.argsort(score, axis=None)[::-1]
+    used_r, used_c = set(), set()
+    for flat in order:
+        if score.flat[flat] < threshold:
+            break
+        r, c = divmod(int(flat), score.shape[1])
+        if r in used_r or c in used_c:
+            continue
+        used_r.add(r)
+        used_c.add(c)
+        rows.append(r)
+        cols.append(c)
+    return rows, cols
+
+
+def _hungarian_assignment(score, threshold):
+    """Optimal matching on IoU (scipy); falls back to greedy without scipy."""
+    try:
+        from scipy.optimize import linear_sum_assignment
+    except ImportError:
+        return _greedy_assignment(score, threshold)
+    if score.size == 0:
+        return [], []
+    r, c = linear_sum_assignment(-score)
+    keep = score[r, c] >= threshold
+    return r[keep].tolist(), c[keep].tolist()
+
+
+class IoUTracker:
+    """
+    Lightweight IoU tracker working on raw detector boxes.
+
+    Tracks are kept in NumPy arrays; each update computes one IoU matrix
+    between live tracks and detections (same class only) and associates
+    them greedily or with the Hungarian method. Unmatched tracks survive
+    `max_age` frames; new tracks get an id once seen `min_hits` times.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_age=5, min_hits=1, matching="greedy"):
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.matching = matching
+        self._assign = _hungarian_assignment if matching == "hungarian" else _greedy_assignment
+
+        self.boxes = np.zeros((0, 4))
+        self.classes = np.zeros(0, dtype=np.int64)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.age = np.zeros(0, dtype=np.int64)
+        self.hits = np.zeros(0, dtype=np.int64)
+        self._next_id = 1
+
+    def update(self, boxes, classes):
+        """
+        Associate this frame's detections with existing tracks.
+
+        Args:
+            boxes: (N, 4) xyxy detections
+            classes: (N,) class indices
+
+        Returns:
+            (N,) array of track ids, -1 for detections not yet confirmed.
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        classes = np.asarray(classes, dtype=np.int64).reshape(-1)
+        n = len(boxes)
+
+        score = iou_matrix(self.boxes, boxes)
+        score[self.classes[:, None] != classes[None, :]] = 0.0
+        rows, cols = self._assign(score, self.iou_threshold)
+
+        track_for_det = np.full(n, -1, dtype=np.int64)
+        track_for_det[cols] = rows
+
+        matched = np.zeros(len(self.ids), dtype=bool)
+        matched[rows] = True
+        self.boxes[rows] = boxes[cols]
+        self.hits[rows] += 1
+        self.age[rows] = 0
+        self.age[~matched] += 1
+
+        new = track_for_det < 0
+        n_new = int(new.sum())
+        if n_new:
+            track_for_det[new] = np.arange(len(self.ids), len(self.ids) + n_new)
+            self.boxes = np.concatenate((self.boxes, boxes[new]))
+            self.classes = np.concatenate((self.classes, classes[new]))
+            self.ids = np.concatenate((self.ids, np.zeros(n_new, dtype=np.int64)))
+            self.age = np.concatenate((self.age, np.zeros(n_new, dtype=np.int64)))
+            self.hits = np.concatenate((self.hits, np.ones(n_new, dtype=np.int64)))
+
+        # Ids are handed out on confirmation so one-frame false positives do not burn ids
+        confirm = (self.ids == 0) & (self.hits >= self.min_hits)
+        n_confirm = int(confirm.sum())
+        if n_confirm:
+            self.ids[confirm] = np.arange(self._next_id, self._next_id + n_confirm)
+            self._next_id += n_confirm
+
+        out = self.ids[track_for_det] if n else np.zeros(0, dtype=np.int64)
+        out = np.where(out > 0, out, -1)
+
+        alive = self.age <= self.max_age
+        if not alive.all():
+            self.boxes = self.boxes[alive]
+            self.classes = self.classes[alive]
+            self.ids = self.ids[alive]
+            self.age = self.age[alive]
+            self.hits = self.hits[alive]
+        return out
+
+    def reset(self):
+        self.__init__(self.iou_threshold, self.max_age, self.min_hits, self.matching)
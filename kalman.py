@@ -0,0 +1,131 @@
+import numpy as np
+
+
+def _kron4(m):
+    """Expand a per-coordinate matrix to the 4 box coordinates (x1, y1, x2, y2)."""
+    return np.kron(np.asarray(m, dtype=np.float64), np.eye(4))
+
+
+class BoxKalmanBank:
+    """
+    Kalman filter state for all tracked boxes, stored as stacked arrays.
+
+    Each row of `x` is one track's state: the box (x1, y1, x2, y2) followed by
+    its per-frame velocity (constant-velocity model). All tracks are predicted
+    and updated together with batched NumPy operations once per frame.
+
+    Tracks that are not observed in a frame keep being predicted, so short
+    detector gaps do not reset their motion state; they are dropped after
+    `max_gap` consecutive missed frames.
+    """
+
+    def __init__(self, process_noise=1.0, measurement_noise=4.0, max_gap=5):
+        f = [[1, 1], [0, 1]]
+        g = np.array([[0.5], [1.0]])
+        p0 = [measurement_noise, 100.0]
+
+        self.dim = 4 * len(f)
+        self.max_gap = max_gap
+        self.F = _kron4(f)
+        self.Q = _kron4(g @ g.T) * process_noise
+        self.R = np.eye(4) * measurement_noise
+        self.P0 = np.diag(np.repeat(p0, 4))
+
+        self.x = np.zeros((0, self.dim))
+        self.P = np.zeros((0, self.dim, self.dim))
+        self.missed = np.zeros(0, dtype=np.int32)
+        self.ids = []
+        self._rows = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, obj_id):
+        return obj_id in self._rows
+
+    def _add(self, new_ids, boxes):
+        n = len(new_ids)
+        x = np.zeros((n, self.dim))
+        x[:, :4] = boxes
+        self.x = np.concatenate((self.x, x))
+        self.P = np.concatenate((self.P, np.broadcast_to(self.P0, (n, self.dim, self.dim))))
+        self.missed = np.concatenate((self.missed, np.zeros(n, dtype=np.int32)))
+        for obj_id in new_ids:
+            self._rows[obj_id] = len(self.ids)
+            self.ids.append(obj_id)
+
+    def _compact(self, keep):
+        self.x = self.x[keep]
+        self.P = self.P[keep]
+        self.missed = self.missed[keep]
+        self.ids = [obj_id for obj_id, k in zip(self.ids, keep) if k]
+        self._rows = {obj_id: i for i, obj_id in enumerate(self.ids)}
+
+    def step(self, observations):
+        """
+        Advance all tracks one frame and fuse this frame's detections.
+
+        Args:
+            observations: {obj_id: (x1, y1, x2, y2)} for tracks seen this frame
+
+        Returns:
+            List of obj_ids dropped for exceeding max_gap.
+        """
+        if len(self.ids):
+            self.x = self.x @ self.F.T
+            self.P = self.F @ self.P @ self.F.T + self.Q
+            self.missed += 1
+
+        known = [(self._rows[i], b) for i, b in observations.items() if i in self._rows]
+        new = [(i, b) for i, b in observations.items() if i not in self._rows]
+
+        if known:
+            rows = np.fromiter((r for r, _ in known), dtype=np.intp, count=len(known))
+            z = np.array([b for _, b in known], dtype=np.float64)
+            P = self.P[rows]
+            S = P[:, :4, :4] + self.R
+            K = P[:, :, :4] @ np.linalg.inv(S)
+            y = z - self.x[rows, :4]
+            self.x[rows] += (K @ y[:, :, None])[:, :, 0]
+            self.P[rows] = P - K @ P[:, :4, :]
+            self.missed[rows] = 0
+
+        if new:
+            self._add([i for i, _ in new], np.array([b for _, b in new], dtype=np.float64))
+
+        dropped = []
+        if len(self.ids):
+            keep = self.missed <= self.max_gap
+            if not keep.all():
+                dropped = [obj_id for obj_id, k in zip(self.ids, keep) if not k]
+                self._compact(keep)
+        return dropped
+
+    def predict(self):
+        """
+        Advance all tracks one frame without observations (detector skipped
+        the frame). Unlike a step() with no detections this is not counted
+        as a miss, so tracks survive long skips.
+        """
+        if len(self.ids):
+            self.x = self.x @ self.F.T
+            self.P = self.F @ self.P @ self.F.T + self.Q
+
+    def remove(self, obj_id):
+        if obj_id in self._rows:
+            keep = np.ones(len(self.ids), dtype=bool)
+            keep[self._rows[obj_id]] = False
+            self._compact(keep)
+
+    def box(self, obj_id):
+        """Filtered box (x1, y1, x2, y2)."""
+        return tuple(self.x[self._rows[obj_id], :4].tolist())
+
+    def velocity(self, obj_id):
+        """Filtered per-frame edge velocity (dx1, dy1, dx2, dy2)."""
+        return tuple(self.x[self._rows[obj_id], 4:8].tolist())
+
+    def predict_box(self, obj_id, frames):
+        """Box position `frames` frames ahead under the motion model."""
+        s = self.x[self._rows[obj_id]]
+        return tuple((s[:4] + s[4:8] * frames).tolist())
@@ -1,12 +1,197 @@
-from geometry import line_intersects_box, get_predicted_vectors, is_box_between_vectors
+from enum import Enum
+
+from geometry import (line_intersects_box, get_predicted_vectors, is_box_between_vectors,
+                      swept_box_time_to_overlap, swept_box_entry_edge, swept_boxes_time_to_overlap)
 import math
 
+CORNER_NAMES = ["TL", "TR", "BL", "BR"]
+# Adjacent corner pairs forming the edges of the bounding box
+EDGE_PAIRS = [(0, 1, "top_edge"), (1, 3, "right_edge"), (3, 2, "bottom_edge"), (2, 0, "left_edge")]
+
+
+class DangerReason(Enum):
+    INSUFFICIENT_HISTORY = "insufficient_history"
+    NOT_CRITICAL_OBJECT = "not_critical_object"
+    INSUFFICIENT_MOVEMENT = "insufficient_movement"
+    CULLED_UNREACHABLE = "culled_unreachable"
+    NO_DANGER = "no_danger_detected"
+    SWEPT_BOX_OVERLAP = "swept_box_overlap"
+    VECTOR_HIT = "vector_hit"
+    SWEEP_THROUGH = "sweep_through"
+    CONTAINS_ZONE = "object_will_contain_crash_zone"
+
+
+class DangerAssessment:
+    """
+    Result of assess_dangers for one track on one frame.
+
+    Carries the geometry computed on the way (corners, motion vectors,
+    predicted corners) so drawing, logging and events reuse it instead of
+    recomputing. Geometry fields are None when the track has too little
+    history. `hit` names the corner ("TL") or edge ("top_edge") that hits
+    the zone, None if unknown or already inside.
+    """
+
+    __slots__ = ("track_id", "cls_name", "box", "is_danger", "code", "hit", "zone", "ttc", "corners",
+                 "motion_vectors", "predicted_corners", "motion_magnitude")
+
+    def __init__(self, track_id, cls_name, box, code, is_danger=False, hit=None, zone=None, ttc=None, corners=None,
+                 motion_vectors=None, predicted_corners=None, motion_magnitude=0.0):
+        self.track_id = track_id
+        self.cls_name = cls_name
+        self.box = box
+        self.is_danger = is_danger
+        self.code = code
+        self.hit = hit
+        self.zone = zone
+        self.ttc = ttc
+        self.corners = corners
+        self.motion_vectors = motion_vectors
+        self.predicted_corners = predicted_corners
+        self.motion_magnitude = motion_magnitude
+
+    @property
+    def reason(self):
+        """Reason string as returned by is_dangerous, e.g. "vector_hit_TL_corner"."""
+        if self.code is DangerReason.VECTOR_HIT:
+            return f"vector_hit_{self.hit}_corner"
+        if self.code is DangerReason.SWEEP_THROUGH:
+            return f"sweep_through_{self.hit}"
+        return self.code.value
+
+    @property
+    def label(self):
+        """Reason prefixed with the hit zone's name, e.g. "crash:swept_box_overlap"."""
+        return f"{self.zone.name}:{self.reason}" if self.zone is not None else self.reason
+
+    def vectors(self):
+        """(corner, predicted corner) arrow pairs, or None without geometry."""
+        if self.predicted_corners is None:
+            return None
+        return list(zip(self.corners, self.predicted_corners))
+
+    def __repr__(self):
+        return f"DangerAssessment(id={self.track_id}, {self.label}, ttc={self.ttc}, hit={self.hit})"
+
+
+def _horizon_frames(fps, config):
+    if fps <= 0:
+        fps = 30  # Default fallback, same as get_predicted_vectors
+    return int(fps * config.get("seconds_to_predict", 3.0))
+
+
+def _corner_vectors(edge_velocity):
+    """Corner vectors [TL, TR, BL, BR] from per-edge velocity (dx1, dy1, dx2, dy2)."""
+    dx1, dy1, dx2, dy2 = edge_velocity
+    return [(dx1, dy1), (dx2, dy1), (dx1, dy2), (dx2, dy2)]
+
+
+def _track_motion(obj, fps, config):
+    """
+    (box, edge_velocity, predicted_box) of a track over the prediction horizon.
+
+    Position and prediction come from the track's motion model: the filtered
+    Kalman state, or the last box and the mean motion of the last
+    position_history_frames boxes.
+    """
+    horizon = max(1, _horizon_frames(fps, config))
+    box = obj.current_box()
+    predicted = obj.predict_box(horizon, config.get("position_history_frames", 6))
+    return box, tuple((p - b) / horizon for p, b in zip(predicted, box)), predicted
+
+
+def _below_min_speed(motion_vectors, fps, config):
+    """
+    True if even the fastest corner moves slower than min_speed_px_s.
+
+    Detector jitter on a standing object leaves a filtered velocity of a
+    pixel or two per frame, which over the prediction horizon is enough to
+    reach a zone a few pixels away.
+    """
+    fps = fps if fps > 0 else 30
+    fastest = max(math.sqrt(dx * dx + dy * dy) for dx, dy in motion_vectors)
+    return fastest * fps < config.get("min_speed_px_s", 60.0)
+
+
+def time_to_collision(obj, fps, crash_box, config):
+    """
+    Closed-form time until the object's box first overlaps the crash zone.
+
+    Applies the same validation as the cascade (history, class, movement)
+    and then a single swept-box slab test.
+
+    Returns:
+        (ttc_seconds, reason); ttc_seconds is None when no collision is
+        predicted within seconds_to_predict.
+    """
+    required_frames = config.get("position_history_frames", 6)
+
+    if len(obj.boxes) < required_frames:
+        return None, "insufficient_history"
+
+    if obj.cls_name not in config.get("critical_objects", []):
+        return None, "not_critical_object"
+
+    box, edge_velocity, _ = _track_motion(obj, fps, config)
+    motion_vectors = _corner_vectors(edge_velocity)
+
+    movement_threshold = config.get("movement_threshold", 1.0)
+    total_movement = sum(math.sqrt(dx * dx + dy * dy) for dx, dy in motion_vectors)
+    if total_movement < movement_threshold or _below_min_speed(motion_vectors, fps, config):
+        return None, "insufficient_movement"
+
+    ttc = swept_box_time_to_overlap(box, edge_velocity, crash_box, _horizon_frames(fps, config))
+    if ttc is None:
+        return None, "no_danger_detected"
+    return ttc / (fps if fps > 0 else 30), "swept_box_overlap"
+
 
 def is_dangerous(obj, fps, crash_box, config):
+    """
+    Decide whether the object will reach the crash zone within seconds_to_predict.
+
+    Uses the closed-form swept-box test by default; set danger_method to
+    "cascade" to use the original geometric test cascade instead.
+    """
+    if config.get("danger_method", "slab") == "cascade":
+        return is_dangerous_cascade(obj, fps, crash_box, config)
+    ttc, reason = time_to_collision(obj, fps, crash_box, config)
+    return ttc is not None, reason
+
+
+def _cascade_test(corners, predicted_positions, crash_box):
+    """Geometric tests of the cascade; returns (DangerReason, hit corner/edge)."""
+    # TEST 1: Check if any corner trajectory hits crash zone
+    for i, (current, predicted) in enumerate(zip(corners, predicted_positions)):
+        if line_intersects_box(current, predicted, crash_box):
+            return DangerReason.VECTOR_HIT, CORNER_NAMES[i]
+
+    # TEST 2: Check if crash zone is between adjacent corner vectors (sweep detection)
+    for i, j, edge_name in EDGE_PAIRS:
+        if is_box_between_vectors(corners[i], predicted_positions[i], corners[j], predicted_positions[j],
+                                  crash_box):
+            return DangerReason.SWEEP_THROUGH, edge_name
+
+    # TEST 3: Additional check - if object will completely contain crash zone
+    pred_x1 = min(p[0] for p in predicted_positions)
+    pred_y1 = min(p[1] for p in predicted_positions)
+    pred_x2 = max(p[0] for p in predicted_positions)
+    pred_y2 = max(p[1] for p in predicted_positions)
+
+    crash_x1, crash_y1, crash_x2, crash_y2 = crash_box
+
+    if (pred_x1 <= crash_x1 and pred_x2 >= crash_x2 and
+            pred_y1 <= crash_y1 and pred_y2 >= crash_y2):
+        return DangerReason.CONTAINS_ZONE, None
+
+    return DangerReason.NO_DANGER, None
+
+
+def is_dangerous_cascade(obj, fps, crash_box, config):
     """
     COMPLETELY REWRITTEN: Proper danger detection logic.
 
-    Only checks:
+    Reference/validation path for time_to_collision. Only checks:
     1. If any corner vector intersects crash zone
     2. If crash zone is between adjacent corner vectors (sweep detection)
     """
@@ -46,7 +231,7 @@ def is_dangerous(obj, fps, crash_box, config):
     movement_threshold = config.get("movement_threshold", 1.0)  # Lowered threshold
     total_movement = sum(math.sqrt(dx * dx + dy * dy) for dx, dy in motion_vectors)
 
-    if total_movement < movement_threshold:
+    if total_movement < movement_threshold or _below_min_speed(motion_vectors, fps, config):
         return False, "insufficient_movement"
 
     # Calculate predicted positions
@@ -60,44 +245,107 @@ def is_dangerous(obj, fps, crash_box, config):
     if len(predicted_positions) != 4:
         return False, "invalid_predictions"
 
-    # TEST 1: Check if any corner trajectory hits crash zone
-    corner_names = ["TL", "TR", "BL", "BR"]
-    for i, (current, predicted) in enumerate(zip(corners, predicted_positions)):
-        if line_intersects_box(current, predicted, crash_box):
-            return True, f"vector_hit_{corner_names[i]}_corner"
+    code, hit = _cascade_test(corners, predicted_positions, crash_box)
+    reason = DangerAssessment(obj.id, obj.cls_name, current_box, code, hit=hit).reason
+    return code is not DangerReason.NO_DANGER, reason
 
-    # TEST 2: Check if crash zone is between adjacent corner vectors (sweep detection)
-    # Adjacent pairs form the edges of the bounding box
-    adjacent_pairs = [
-        (0, 1, "top_edge"),  # Top-Left to Top-Right
-        (1, 3, "right_edge"),  # Top-Right to Bottom-Right
-        (3, 2, "bottom_edge"),  # Bottom-Right to Bottom-Left
-        (2, 0, "left_edge")  # Bottom-Left to Top-Left
-    ]
 
-    for i, j, edge_name in adjacent_pairs:
-        corner1 = corners[i]
-        predicted1 = predicted_positions[i]
-        corner2 = corners[j]
-        predicted2 = predicted_positions[j]
+def _prepare_assessment(obj, fps, zone_grid, config, stats):
+    """
+    Geometry, culling and validation of one track for assess_dangers.
 
-        if is_box_between_vectors(corner1, predicted1, corner2, predicted2, crash_box):
-            return True, f"sweep_through_{edge_name}"
+    Returns:
+        (DangerAssessment, position, edge_velocity, candidate zones); the
+        candidates are empty when the exact zone tests can be skipped.
+    """
+    required_frames = config.get("position_history_frames", 6)
+    box = obj.boxes[-1] if obj.boxes else None
+    if len(obj.boxes) < required_frames:
+        return DangerAssessment(obj.id, obj.cls_name, box, DangerReason.INSUFFICIENT_HISTORY), None, None, []
 
-    # TEST 3: Additional check - if object will completely contain crash zone
-    # Check if crash zone will be inside the predicted bounding box
-    pred_x1 = min(p[0] for p in predicted_positions)
-    pred_y1 = min(p[1] for p in predicted_positions)
-    pred_x2 = max(p[0] for p in predicted_positions)
-    pred_y2 = max(p[1] for p in predicted_positions)
+    position, edge_velocity, (px1, py1, px2, py2) = _track_motion(obj, fps, config)
+    x1, y1, x2, y2 = position
+    corners = [(x1, y1), (x2, y1), (x1, y2), (x2, y2)]
+    motion_vectors = _corner_vectors(edge_velocity)
+    predicted = [(px1, py1), (px2, py1), (px1, py2), (px2, py2)]
+    magnitude = sum(math.sqrt(dx * dx + dy * dy) for dx, dy in motion_vectors)
+    result = DangerAssessment(obj.id, obj.cls_name, box, DangerReason.NO_DANGER, corners=corners,
+                              motion_vectors=motion_vectors, predicted_corners=predicted,
+                              motion_magnitude=magnitude)
+
+    candidates = zone_grid.query((min(x1, px1), min(y1, py1), max(x2, px2), max(y2, py2)))
+    if not candidates:
+        if stats is not None:
+            stats["culled"] = stats.get("culled", 0) + 1
+        result.code = DangerReason.CULLED_UNREACHABLE
+        return result, position, edge_velocity, []
+
+    if stats is not None:
+        stats["evaluated"] = stats.get("evaluated", 0) + 1
 
-    crash_x1, crash_y1, crash_x2, crash_y2 = crash_box
+    if obj.cls_name not in config.get("critical_objects", []):
+        result.code = DangerReason.NOT_CRITICAL_OBJECT
+        return result, position, edge_velocity, []
+    if magnitude < config.get("movement_threshold", 1.0) or _below_min_speed(motion_vectors, fps, config):
+        result.code = DangerReason.INSUFFICIENT_MOVEMENT
+        return result, position, edge_velocity, []
+    return result, position, edge_velocity, candidates
 
-    if (pred_x1 <= crash_x1 and pred_x2 >= crash_x2 and
-            pred_y1 <= crash_y1 and pred_y2 >= crash_y2):
-        return True, "object_will_contain_crash_zone"
 
-    return False, "no_danger_detected"
+def assess_dangers(objs, fps, zone_grid, config, stats=None):
+    """
+    Assess the tracks of one frame against every zone they can reach.
+
+    Corners, motion vectors and predicted corners are computed once per
+    track from its motion model (see _track_motion) and kept on the
+    returned DangerAssessment. Each track's swept box over the prediction
+    horizon is looked up in the zone grid first; tracks whose swept box
+    touches no zone are culled without running the exact tests.
+
+    The slab test runs once per zone for all tracks that can reach it
+    (swept_boxes_time_to_overlap), and each track takes the most severe zone
+    it hits (ttc set). With danger_method="cascade" the geometric cascade
+    runs per track instead (ttc None).
+
+    stats (optional dict) gets its "culled" / "evaluated" counters bumped.
+
+    Returns:
+        DangerAssessments in the order of objs.
+    """
+    prepared = [_prepare_assessment(obj, fps, zone_grid, config, stats) for obj in objs]
+    pending = [p for p in prepared if p[3]]
+
+    if config.get("danger_method", "slab") == "cascade":
+        for result, _, _, candidates in pending:
+            for zone in candidates:
+                code, hit = _cascade_test(result.corners, result.predicted_corners, zone.box)
+                if code is not DangerReason.NO_DANGER:
+                    result.is_danger, result.code, result.hit, result.zone = True, code, hit, zone
+                    break
+        return [p[0] for p in prepared]
+
+    # Bölge başına tek vektörel slab testi; izler en ciddi isabet eden bölgeyi alır
+    horizon = _horizon_frames(fps, config)
+    hits = [{} for _ in pending]
+    for zone in zone_grid.zones:
+        rows = [i for i, p in enumerate(pending) if zone in p[3]]
+        if not rows:
+            continue
+        frames = swept_boxes_time_to_overlap([pending[i][1] for i in rows], [pending[i][2] for i in rows],
+                                             zone.box, horizon)
+        for i, t in zip(rows, frames.tolist()):
+            hits[i][zone] = t
+
+    fps = fps if fps > 0 else 30
+    for (result, position, edge_velocity, candidates), zone_hits in zip(pending, hits):
+        for zone in candidates:
+            frames = zone_hits[zone]
+            if frames != float("inf"):
+                result.is_danger, result.code, result.zone = True, DangerReason.SWEPT_BOX_OVERLAP, zone
+                result.ttc = frames / fps
+                result.hit = swept_box_entry_edge(position, edge_velocity, zone.box)
+                break
+    return [p[0] for p in prepared]
 
 
 def debug_danger_detection(obj, fps, crash_box, config):
@@ -0,0 +1,132 @@
+import time
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    Decides per frame whether the detector has to run.
+
+    The frame is shrunk to `width` pixels, converted to grayscale and
+    compared with the thumbnail of the last frame the detector saw. The
+    mean absolute difference is taken per grid cell; a cell counts as
+    changed above `cell_threshold` (0-255). Inference runs when the share
+    of changed cells exceeds `min_changed_ratio`, when any changed cell
+    touches the crash box or a named zone grown by `zone_margin` (fraction
+    of the frame), or after `max_skip` consecutive skipped frames.
+
+    Comparing against the last inferred frame rather than the previous one
+    means slow drift (a creeping pedestrian) still adds up to a trigger.
+    """
+
+    def __init__(self, width=160, grid=(8, 6), cell_threshold=8.0, min_changed_ratio=0.02,
+                 max_skip=10, zone_margin=0.05):
+        self.width = width
+        self.grid = grid
+        self.cell_threshold = cell_threshold
+        self.min_changed_ratio = min_changed_ratio
+        self.max_skip = max_skip
+        self.zone_margin = zone_margin
+
+        self._reference = None
+        self._small = None
+        self._gray = None
+        self._zone_cells = None
+        self._skipped_run = 0
+
+        self.frames = 0
+        self.skipped = 0
+        self.forced = {"first": 0, "max_skip": 0, "zone": 0, "scene": 0}
+        self.gate_s = 0.0
+        self.inference_s = 0.0
+        self.inferences = 0
+
+    def _thumbnail(self, frame):
+        h, w = frame.shape[:2]
+        cols, rows = self.grid
+        # Hücre boyutu tam bölünsün ki reshape ile hücre ortalaması alınabilsin
+        tw = max(cols, self.width // cols * cols)
+        th = max(rows, int(round(tw * h / w / rows)) * rows)
+        if self._small is None or self._small.shape[:2] != (th, tw):
+            self._small = np.empty((th, tw, 3), dtype=np.uint8)
+            self._gray = np.empty((th, tw), dtype=np.uint8)
+            self._reference = None
+            self._zone_cells = None
+        cv2.resize(frame, (tw, th), dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        return self._gray
+
+    def _cells_near(self, box, w, h):
+        cols, rows = self.grid
+        mask = np.zeros((rows, cols), dtype=bool)
+        if box is None:
+            return mask
+        mx, my = self.zone_margin * w, self.zone_margin * h
+        x1, y1, x2, y2 = box
+        c1 = int(np.clip((x1 - mx) / w * cols, 0, cols - 1))
+        c2 = int(np.clip((x2 + mx) / w * cols, 0, cols - 1))
+        r1 = int(np.clip((y1 - my) / h * rows, 0, rows - 1))
+        r2 = int(np.clip((y2 + my) / h * rows, 0, rows - 1))
+        mask[r1:r2 + 1, c1:c2 + 1] = True
+        return mask
+
+    def check(self, frame, zone_boxes=()):
+        """
+        Return (run_inference, reason) for this frame. zone_boxes are the
+        crash box and named zones; they are read on the first comparison.
+        """
+        t0 = time.perf_counter()
+        self.frames += 1
+        gray = self._thumbnail(frame)
+        h, w = frame.shape[:2]
+
+        if self._reference is None:
+            reason = "first"
+        elif self._skipped_run >= self.max_skip:
+            reason = "max_skip"
+        else:
+            cols, rows = self.grid
+            th, tw = gray.shape
+            diff = cv2.absdiff(gray, self._reference)
+            energy = diff.reshape(rows, th // rows, cols, tw // cols).mean(axis=(1, 3))
+            changed = energy > self.cell_threshold
+            if self._zone_cells is None:
+                self._zone_cells = np.zeros((rows, cols), dtype=bool)
+                for box in zone_boxes:
+                    self._zone_cells |= self._cells_near(box, w, h)
+            if (changed & self._zone_cells).any():
+                reason = "zone"
+            elif changed.mean() > self.min_changed_ratio:
+                reason = "scene"
+            else:
+                reason = None
+
+        if reason is None:
+            self._skipped_run += 1
+            self.skipped += 1
+        else:
+            self.forced[reason] += 1
+            self._skipped_run = 0
+            if self._reference is None:
+                self._reference = gray.copy()
+            else:
+                np.copyto(self._reference, gray)
+        self.gate_s += time.perf_counter() - t0
+        return reason is not None, reason
+
+    def add_inference_time(self, seconds):
+        self.inference_s += seconds
+        self.inferences += 1
+
+    def stats(self):
+        """Skipped frames and detector time saved, net of the gate's own cost."""
+        avg_inference = self.inference_s / self.inferences if self.inferences else 0.0
+        return {
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "skip_ratio": self.skipped / self.frames if self.frames else 0.0,
+            "forced": dict(self.forced),
+            "gate_ms": self.gate_s / self.frames * 1000 if self.frames else 0.0,
+            "saved_s": max(self.skipped * avg_inference - self.gate_s, 0.0),
+        }
@@ -0,0 +1,203 @@
+import time
+
+import cv2
+import numpy as np
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+COLOR_VEHICLE = (0, 255, 0)
+COLOR_CRASH = (0, 0, 255)
+COLOR_TRACK = (0, 200, 255)
+COLOR_DANGER = (0, 0, 255)
+COLOR_VECTOR = (255, 0, 255)
+COLOR_HINT = (200, 200, 200)
+# Zone colours by severity (1 = lowest)
+COLOR_ZONES = {1: (0, 255, 255), 2: (0, 128, 255), 3: (0, 0, 255)}
+
+
+class TextSprite:
+    """Pre-rendered text patch with its own alpha mask."""
+
+    __slots__ = ("image", "mask", "baseline")
+
+    def __init__(self, text, scale, color, thickness):
+        (tw, th), baseline = cv2.getTextSize(text, FONT, scale, thickness)
+        h, w = th + baseline + thickness, tw + thickness
+        self.image = np.zeros((h, w, 3), dtype=np.uint8)
+        self.mask = np.zeros((h, w), dtype=np.uint8)
+        origin = (0, th)
+        cv2.putText(self.image, text, origin, FONT, scale, color, thickness)
+        cv2.putText(self.mask, text, origin, FONT, scale, 255, thickness)
+        # Baseline offset so sprites are placed like cv2.putText origins
+        self.baseline = th
+
+
+class OverlayRenderer:
+    """
+    Draws the detection overlay in place into a reused output buffer.
+
+    Primitives (zones, track boxes, motion vectors, text) are drawn into a
+    separate overlay layer, which is only redrawn every `refresh_frames`
+    frames and composited onto each new frame with a mask. Static strings
+    are rendered once into TextSprite patches and blitted afterwards.
+    """
+
+    def __init__(self, refresh_frames=1, debug_draw=False, max_sprites=64):
+        self.refresh_frames = max(1, int(refresh_frames))
+        self.debug_draw = debug_draw
+        self.max_sprites = max_sprites
+
+        self._buffer = None
+        self._layer = None
+        self._mask = None
+        self._static_sprites = {}
+        self._frames_since_refresh = None
+        self._last_danger = None
+
+        self.last_ms = 0.0
+        self.total_ms = 0.0
+        self.frames = 0
+        self.refreshes = 0
+
+    def _ensure_buffers(self, shape):
+        if self._buffer is None or self._buffer.shape != shape:
+            self._buffer = np.empty(shape, dtype=np.uint8)
+            self._layer = np.zeros(shape, dtype=np.uint8)
+            self._mask = np.zeros(shape[:2], dtype=np.uint8)
+            self._frames_since_refresh = None
+
+    def sprite(self, text, scale, color, thickness):
+        """Return a cached sprite for a static string."""
+        key = (text, scale, color, thickness)
+        spr = self._static_sprites.get(key)
+        if spr is None:
+            if len(self._static_sprites) >= self.max_sprites:
+                self._static_sprites.pop(next(iter(self._static_sprites)))
+            spr = TextSprite(text, scale, color, thickness)
+            self._static_sprites[key] = spr
+        return spr
+
+    def _blit(self, spr, org):
+        """Copy a sprite into the overlay layer at a putText-style origin."""
+        x, y = org
+        y -= spr.baseline
+        H, W = self._layer.shape[:2]
+        h, w = spr.mask.shape
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, W), min(y + h, H)
+        if x0 >= x1 or y0 >= y1:
+            return
+        sx, sy = x0 - x, y0 - y
+        src_img = spr.image[sy:sy + (y1 - y0), sx:sx + (x1 - x0)]
+        src_mask = spr.mask[sy:sy + (y1 - y0), sx:sx + (x1 - x0)]
+        cv2.copyTo(src_img, src_mask, self._layer[y0:y1, x0:x1])
+        cv2.bitwise_or(self._mask[y0:y1, x0:x1], src_mask, dst=self._mask[y0:y1, x0:x1])
+
+    def _rect(self, p1, p2, color, thickness=2):
+        cv2.rectangle(self._layer, p1, p2, color, thickness)
+        cv2.rectangle(self._mask, p1, p2, 255, thickness)
+
+    def _arrow(self, p1, p2, color, thickness=2):
+        cv2.arrowedLine(self._layer, p1, p2, color, thickness)
+        cv2.arrowedLine(self._mask, p1, p2, 255, thickness)
+
+    def _text(self, text, org, scale, color, thickness):
+        """Dynamic text that changes every refresh (e.g. FPS counter)."""
+        cv2.putText(self._layer, text, org, FONT, scale, color, thickness)
+        cv2.putText(self._mask, text, org, FONT, scale, 255, thickness)
+
+    def needs_refresh(self):
+        return self._frames_since_refresh is None or self._frames_since_refresh + 1 >= self.refresh_frames
+
+    def render(self, frame, vehicle_box, crash_box, tracks, fps, danger_label=None, hints=(),
+               zones=(), info_lines=(), alarm_ids=None):
+        """
+        Composite the overlay onto `frame` and return the reused output buffer.
+
+        Args:
+            frame: BGR frame to draw on (not modified)
+            vehicle_box, crash_box: zone boxes as (x1, y1, x2, y2)
+            tracks: iterable of DangerAssessment for critical tracks; box,
+                    danger flag and predicted corner arrows are read from it
+            fps: value shown in the FPS counter
+            danger_label: class name of the dangerous object, None if safe
+            hints: iterable of static key-hint strings, drawn bottom-right
+            zones: extra named Zone objects to outline (debug only)
+            info_lines: extra dynamic debug text lines, drawn under the FPS counter
+            alarm_ids: track ids drawn as dangerous; None uses each track's is_danger
+        """
+        t0 = time.perf_counter()
+        self._ensure_buffers(frame.shape)
+
+        # A change in danger state is never deferred to the next refresh
+        if self.needs_refresh() or danger_label != self._last_danger:
+            self._last_danger = danger_label
+            self._redraw_layer(frame.shape, vehicle_box, crash_box, tracks, fps, danger_label, hints,
+                               zones, info_lines, alarm_ids)
+            self._frames_since_refresh = 0
+            self.refreshes += 1
+        else:
+            self._frames_since_refresh += 1
+
+        np.copyto(self._buffer, frame)
+        cv2.copyTo(self._layer, self._mask, self._buffer)
+
+        self.last_ms = (time.perf_counter() - t0) * 1000
+        self.total_ms += self.last_ms
+        self.frames += 1
+        return self._buffer
+
+    def _redraw_layer(self, shape, vehicle_box, crash_box, tracks, fps, danger_label, hints,
+                      zones, info_lines, alarm_ids):
+        h, w = shape[:2]
+        self._layer.fill(0)
+        self._mask.fill(0)
+
+        if self.debug_draw:
+            self._rect((vehicle_box[0], vehicle_box[1]), (vehicle_box[2], vehicle_box[3]), COLOR_VEHICLE)
+            self._rect((crash_box[0], crash_box[1]), (crash_box[2], crash_box[3]), COLOR_CRASH)
+            for zone in zones:
+                if tuple(zone.box) == tuple(crash_box):
+                    continue  # Kalibre edilen bölge yukarıda çizildi
+                color = COLOR_ZONES.get(min(zone.severity, 3), COLOR_CRASH)
+                x1, y1, x2, y2 = zone.box
+                self._rect((x1, y1), (x2, y2), color)
+                self._blit(self.sprite(zone.name, 0.5, color, 1), (x1 + 4, y1 + 16))
+
+        for track in tracks:
+            x1, y1, x2, y2 = track.box
+            if track.is_danger if alarm_ids is None else track.track_id in alarm_ids:
+                self._rect((x1, y1), (x2, y2), COLOR_DANGER)
+            elif self.debug_draw:
+                self._rect((x1, y1), (x2, y2), COLOR_TRACK, 1)
+            if self.debug_draw and track.predicted_corners is not None:
+                for start, end in zip(track.corners, track.predicted_corners):
+                    self._arrow((int(start[0]), int(start[1])), (int(end[0]), int(end[1])), COLOR_VECTOR)
+
+        self._text(f"FPS: {fps:.2f}", (w - 150, 50), 0.6, (255, 255, 255), 2)
+        if self.debug_draw:
+            self._text(f"Overlay: {self.avg_ms():.2f} ms", (w - 220, 75), 0.5, (255, 255, 255), 1)
+            for i, line in enumerate(info_lines):
+                self._text(line, (w - 220, 95 + 20 * i), 0.5, (255, 255, 255), 1)
+
+        if danger_label:
+            self._blit(self.sprite(f"TEHLIKE: {danger_label.upper()}!", 1.0, COLOR_DANGER, 3), (50, 50))
+        else:
+            self._blit(self.sprite("Sistem Calisiyor - Tehlike Yok", 0.8, (0, 255, 0), 2), (50, 50))
+
+        y = h - 5
+        for hint in hints:
+            spr = self.sprite(hint, 0.6, COLOR_HINT, 2)
+            self._blit(spr, (w - spr.mask.shape[1] - 10, y))
+            y -= 25
+
+    def avg_ms(self):
+        return self.total_ms / self.frames if self.frames else 0.0
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "refreshes": self.refreshes,
+            "last_ms": self.last_ms,
+            "avg_ms": self.avg_ms(),
+        }
@@ -0,0 +1,281 @@
+import copy
+from collections import OrderedDict
+
+import cv2
+
+from frame_index import load_frame_index, seek
+from logic import assess_dangers
+
+
+class FrameRecord:
+    __slots__ = ("frame_no", "frame", "detections", "fps", "assessments", "danger_label", "alarm_ids")
+
+    def __init__(self, frame_no, frame, detections, fps, assessments, danger_label, alarm_ids):
+        self.frame_no = frame_no
+        self.frame = frame
+        self.detections = detections
+        self.fps = fps
+        self.assessments = assessments
+        self.danger_label = danger_label
+        self.alarm_ids = alarm_ids
+
+
+class ReviewCache:
+    """
+    Bounded store behind frame-by-frame review.
+
+    Decoded frames with their assessments are kept newest-first up to
+    `max_bytes`; the much smaller per-frame detections and AlertManager
+    alarm sets are kept back to the oldest checkpoint. Every `checkpoint_every` frames a deep copy of the
+    TrackingState is taken (at most `max_checkpoints`), so a frame whose
+    image was evicted can be rebuilt by replaying cached detections from
+    the nearest earlier checkpoint instead of from the start. `on_evict` is
+    called with each frame image that leaves the cache (FramePool.release).
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, checkpoint_every=30, max_checkpoints=20, on_evict=None):
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.max_checkpoints = max(1, max_checkpoints)
+        self.frames = OrderedDict()
+        self.detections = {}
+        self.checkpoints = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.replayed_frames = 0
+
+    def add(self, record):
+        old = self.frames.pop(record.frame_no, None)
+        if old is not None:
+            self._evicted(old)
+        self.frames[record.frame_no] = record
+        self.bytes += record.frame.nbytes
+        self.detections[record.frame_no] = (record.detections, record.fps, record.alarm_ids)
+        while self.bytes > self.max_bytes and len(self.frames) > 1:
+            _, evicted = self.frames.popitem(last=False)
+            self._evicted(evicted)
+
+    def _evicted(self, record):
+        self.bytes -= record.frame.nbytes
+        if self.on_evict is not None:
+            self.on_evict(record.frame)
+
+    def clear(self):
+        """Drop every cached frame, handing the images back through on_evict."""
+        while self.frames:
+            self._evicted(self.frames.popitem()[1])
+
+    def get(self, frame_no):
+        record = self.frames.get(frame_no)
+        if record is None:
+            self.misses += 1
+            return None
+        self.frames.move_to_end(frame_no)
+        self.hits += 1
+        return record
+
+    def checkpoint(self, frame_no, state, force=False):
+        """Snapshot the tracking state after frame_no on checkpoint boundaries."""
+        if not force and frame_no % self.checkpoint_every:
+            return
+        self.checkpoints[frame_no] = copy.deepcopy(state)
+        while len(self.checkpoints) > self.max_checkpoints:
+            self.checkpoints.popitem(last=False)
+        oldest = next(iter(self.checkpoints))
+        for n in [n for n in self.detections if n <= oldest]:
+            del self.detections[n]
+
+    def replay(self, frame_no, names):
+        """
+        Rebuild the tracks of frame_no from the nearest earlier checkpoint.
+
+        Returns the TrackedObjects seen on frame_no and the frame's fps, or
+        (None, None) if the frame is older than every checkpoint.
+        """
+        start = max((n for n in self.checkpoints if n < frame_no), default=None)
+        if start is None:
+            return None, None
+        state = copy.deepcopy(self.checkpoints[start])
+        frame_objects, fps = None, None
+        for n in range(start + 1, frame_no + 1):
+            if n not in self.detections:
+                return None, None
+            detections, fps, _ = self.detections[n]
+            # None: dedektörün atlandığı kare, izler yalnızca tahminle ilerler
+            if detections is None:
+                frame_objects, lost_ids = state.predict()
+            else:
+                frame_objects, lost_ids = state.update(detections, names)
+            for oid in lost_ids:
+                state.remove(oid)
+            self.replayed_frames += 1
+        return frame_objects, fps
+
+    def stats(self):
+        return {
+            "frames": len(self.frames),
+            "mb": self.bytes / (1024 * 1024),
+            "checkpoints": len(self.checkpoints),
+            "hits": self.hits,
+            "misses": self.misses,
+            "replayed_frames": self.replayed_frames,
+        }
+
+
+def most_urgent_label(assessments, alarm_ids=None):
+    """
+    Class name of the dangerous track with the smallest TTC, None if safe.
+    With alarm_ids only tracks in the alarm state count, as on the live view.
+    """
+    label, best = None, float("inf")
+    for a in assessments:
+        if a.is_danger if alarm_ids is None else a.track_id in alarm_ids:
+            ttc = a.ttc if a.ttc is not None else 0.0
+            if label is None or ttc < best:
+                label, best = a.cls_name, ttc
+    return label
+
+
+class Reviewer:
+    """
+    Interactive back/forward stepping for enable_fbf mode.
+
+    The detection loop hands over every processed frame through record()
+    and calls interact() after showing it. Frames still in the cache are
+    redrawn straight away; evicted frames of a video are decoded again via
+    the keyframe index and their tracks replayed from a checkpoint.
+    """
+
+    def __init__(self, cache, renderer, names, settings, window, video_path=None, start_frame=0,
+                 frame_stride=1, max_size=(1280, 720), pool=None):
+        self.cache = cache
+        self.renderer = renderer
+        self.names = names
+        self.settings = settings
+        self.window = window
+        self.video_path = video_path
+        self.start_frame = start_frame
+        self.frame_stride = frame_stride
+        self.max_size = max_size
+        self.pool = pool
+        self.layout = None
+        self._cap = None
+        self._index = None
+
+    def set_layout(self, vehicle_box, crash_box, zone_grid, hints):
+        self.layout = (vehicle_box, crash_box, zone_grid, hints)
+
+    def record(self, frame_no, frame, detections, fps, assessments, danger_label, state, alarm_ids):
+        # Havuz tamponu kopyalanmaz, önbellekten çıkana kadar incelemeye ait olur
+        if self.pool is None or not self.pool.hold(frame, "review"):
+            frame = frame.copy()
+        self.cache.add(FrameRecord(frame_no, frame, detections, fps, assessments, danger_label,
+                                   frozenset(alarm_ids)))
+        self.cache.checkpoint(frame_no, state)
+
+    def _decode(self, frame_no):
+        if self.video_path is None:
+            return None
+        if self._cap is None:
+            self._cap = cv2.VideoCapture(self.video_path)
+            self._index = load_frame_index(self.video_path)
+        if not seek(self._cap, self._index, self.start_frame + (frame_no - 1) * self.frame_stride):
+            return None
+        ret, frame = self._cap.read()
+        if not ret:
+            return None
+        h, w = frame.shape[:2]
+        max_w, max_h = self.max_size
+        if w > max_w or h > max_h:
+            scale = min(max_w / w, max_h / h)
+            frame = cv2.resize(frame, (int(w * scale), int(h * scale)))
+        return frame
+
+    def _rebuild(self, frame_no):
+        frame_objects, fps = self.cache.replay(frame_no, self.names)
+        if frame_objects is None:
+            return None
+        frame = self._decode(frame_no)
+        if frame is None:
+            return None
+        zone_grid = self.layout[2]
+        assessments = assess_dangers(frame_objects, fps, zone_grid, self.settings)
+        detections, _, alarm_ids = self.cache.detections[frame_no]
+        record = FrameRecord(frame_no, frame, detections, fps, assessments,
+                             most_urgent_label(assessments, alarm_ids), alarm_ids)
+        self.cache.add(record)
+        return record
+
+    def show(self, frame_no):
+        """Draw a past frame; returns False if it can no longer be rebuilt."""
+        record = self.cache.get(frame_no) or self._rebuild(frame_no)
+        if record is None:
+            return False
+        vehicle_box, crash_box, zone_grid, hints = self.layout
+        zones = zone_grid.zones if self.settings.get("zones") else ()
+        out = self.renderer.render(record.frame, vehicle_box, crash_box, record.assessments, record.fps,
+                                   record.danger_label, hints, zones, [f"Inceleme: kare {frame_no}"],
+                                   record.alarm_ids)
+        cv2.imshow(self.window, out)
+        return True
+
+    def interact(self, frontier):
+        """
+        Handle review keys after frame `frontier` was shown.
+
+        Returns "next" to process the next frame, "quit", or a frame number
+        beyond the frontier to fast-forward to.
+        """
+        view = frontier
+        while True:
+            key = cv2.waitKey(0) & 0xFF
+            if key in (ord("q"), ord("Q")):
+                return "quit"
+            if key in (ord("a"), ord("A"), 8):
+                if view <= 1:
+                    continue
+                if self.show(view - 1):
+                    view -= 1
+                else:
+                    print(f"[REVIEW] Kare {view - 1} artık önbellekte değil")
+            elif key in (ord("d"), ord("D"), 13, 32):
+                if view >= frontier:
+                    return "next"
+                view += 1
+                self.show(view)
+            elif key in (ord("g"), ord("G")):
+                target = self._read_number("Gidilecek kare")
+                if target is None:
+                    continue
+                if target > frontier:
+                    return target
+                if target >= 1 and self.show(target):
+                    view = target
+                else:
+                    print(f"[REVIEW] Kare {target} artık önbellekte değil")
+
+    def _read_number(self, prompt):
+        """
+        Collect digit keys in the OpenCV window until Enter (Esc cancels).
+
+        The typed number is shown in the window title, so no console is
+        needed (the launcher has none).
+        """
+        digits = ""
+        while True:
+            cv2.setWindowTitle(self.window, f"{prompt}: {digits}_  (Enter: git, Esc: iptal)")
+            key = cv2.waitKey(0) & 0xFF
+            if ord("0") <= key <= ord("9"):
+                digits += chr(key)
+            elif key == 8:
+                digits = digits[:-1]
+            elif key in (13, 10, 27):
+                cv2.setWindowTitle(self.window, self.window)
+                return int(digits) if key != 27 and digits else None
+
+    def close(self):
+        self.cache.clear()
+        if self._cap is not None:
+            self._cap.release()
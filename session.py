@@ -0,0 +1,208 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from config import load_user_settings
+from detector import apply_thread_settings, run_detection
+from frame_index import load_frame_index, seek
+from frame_pool import FramePool
+
+
+def load_yolo(settings):
+    from ultralytics import YOLO
+    return YOLO(settings.get("model_path", "models/yolov8n.pt"))
+
+
+def _is_tracker_callback(func):
+    return getattr(getattr(func, "func", func), "__module__", "").startswith("ultralytics.trackers")
+
+
+class DetectionSession:
+    """
+    Long-lived owner of the model, capture sources and frame buffers.
+
+    The model is loaded and warmed up on a background thread (warm_up())
+    while the menu is showing, then reused by every run() instead of being
+    loaded again from disk. The live camera stays open between runs and
+    the last video file's capture is kept and seeked; the frame pool keeps
+    its buffers. Per-run state (tracks, alerts, event session) is still
+    built fresh by run_detection, and the ultralytics tracker is reset so
+    ids do not leak from one run into the next.
+
+    stop() may be called from any thread to end the current run after the
+    frame in progress.
+    """
+
+    def __init__(self, settings=None, model_factory=load_yolo):
+        self.settings = settings
+        self.model_factory = model_factory
+        self.model = None
+        self.model_path = None
+        self.load_s = None
+        self.warmup_s = None
+        self.first_frame_s = None
+        self.runs = 0
+
+        self._ready = threading.Event()
+        self._thread = None
+        self._error = None
+        self._stop = threading.Event()
+        self._camera = None
+        self._camera_index = None
+        self._video = None
+        self._video_path = None
+        self._pool = None
+
+    def _settings(self):
+        return self.settings if self.settings is not None else load_user_settings()
+
+    def warm_up(self):
+        """Start loading and warming the model in the background; returns immediately."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        settings = self._settings()
+        if self._ready.is_set() and settings.get("model_path") == self.model_path:
+            return
+        self._ready.clear()
+        self._error = None
+        # Kopya: yükleme sürerken ayarlar değişirse model_path yüklenen modeli göstermeye devam eder
+        self._thread = threading.Thread(target=self._load, args=(dict(settings),), daemon=True)
+        self._thread.start()
+
+    def _load(self, settings):
+        try:
+            apply_thread_settings(settings)
+            t0 = time.perf_counter()
+            model = self.model_factory(settings)
+            self.load_s = time.perf_counter() - t0
+
+            # İlk çıkarımın kurulum maliyeti menüde ödenir
+            t0 = time.perf_counter()
+            h = settings.get("max_frame_height", 720)
+            w = settings.get("max_frame_width", 1280)
+            model.predict(np.zeros((h, w, 3), dtype=np.uint8), imgsz=settings.get("inference_imgsz", 640),
+                          verbose=False)
+            self.warmup_s = time.perf_counter() - t0
+            self.model = model
+            self.model_path = settings.get("model_path")
+        except Exception as e:
+            self._error = e
+        finally:
+            self._ready.set()
+
+    def ready(self):
+        return self._ready.is_set() and self._error is None
+
+    def wait_ready(self, timeout=None):
+        """Block until the model is loaded; re-raises a load failure."""
+        if self._thread is None:
+            self.warm_up()
+        if not self._ready.wait(timeout):
+            return False
+        if self._error is not None:
+            raise self._error
+        return True
+
+    def _live_capture(self, settings):
+        index = settings.get("camera_index", 0)
+        if self._camera is None or index != self._camera_index or not self._camera.isOpened():
+            if self._camera is not None:
+                self._camera.release()
+            self._camera = cv2.VideoCapture(index)
+            # Menüde beklerken biriken eski kareler okunmasın
+            self._camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            self._camera_index = index
+        return self._camera
+
+    def _video_capture(self, video_path, start_frame):
+        if self._video is None or video_path != self._video_path or not self._video.isOpened():
+            if self._video is not None:
+                self._video.release()
+            self._video = cv2.VideoCapture(video_path)
+            self._video_path = video_path
+        seek(self._video, load_frame_index(video_path), start_frame)
+        return self._video
+
+    def _reset_tracker(self, settings):
+        """
+        Reset the ultralytics tracker for a run that uses model.track, or
+        detach it for one that does not. track() leaves its callbacks on the
+        model, so a later predict() (iou or tiled backend) would still step
+        BoT-SORT and drop every box it does not track.
+        """
+        predictor = getattr(self.model, "predictor", None)
+        if settings.get("tracker_backend", "ultralytics") != "iou" and not settings.get("tiled_inference", False):
+            for tracker in getattr(predictor, "trackers", None) or ():
+                tracker.reset()
+            return
+        callbacks = getattr(self.model, "callbacks", None) or {}
+        for event in ("on_predict_start", "on_predict_postprocess_end"):
+            if event in callbacks:
+                callbacks[event][:] = [f for f in callbacks[event] if not _is_tracker_callback(f)]
+        # track() kayıtları yeniden ekler ve izleyiciyi sıfırdan kurar
+        if predictor is not None and hasattr(predictor, "trackers"):
+            del predictor.trackers
+
+    def run(self, mode="live", video_path=None, start_frame=0, headless=False, on_event=None):
+        """Run one detection session on the shared model and captures; blocks until it ends."""
+        t_start = time.perf_counter()
+        settings = self._settings()
+        # Yükleme sürerken model yolu değiştiyse eski model kullanılmaz, yenisi beklenir
+        while True:
+            if settings.get("model_path") != self.model_path:
+                self.warm_up()
+            if not self._ready.is_set():
+                print("[SESSION] Model yükleniyor...")
+            self.wait_ready()
+            if settings.get("model_path") == self.model_path:
+                break
+            print(f"[SESSION] Model yolu değişti, {settings.get('model_path')} yükleniyor")
+        apply_thread_settings(settings)
+        self._reset_tracker(settings)
+
+        if mode == "test":
+            cap = self._video_capture(video_path, start_frame)
+        else:
+            cap = self._live_capture(settings)
+
+        depth = settings.get("frame_pool_depth", 2)
+        if self._pool is None or self._pool.depth != max(1, depth):
+            self._pool = FramePool(depth)
+        # Havuz istatistikleri oturum başına raporlanır
+        self._pool.reset_stats()
+
+        self._stop.clear()
+        self.first_frame_s = None
+
+        def on_frame(frame_count, latency_s):
+            if self.first_frame_s is None:
+                self.first_frame_s = time.perf_counter() - t_start
+            return not self._stop.is_set()
+
+        self.runs += 1
+        run_detection(mode, video_path, start_frame, model=self.model, cap=cap, settings=settings,
+                      headless=headless, on_frame=on_frame, on_event=on_event, pool=self._pool,
+                      release_capture=False)
+        if settings["enable_log"] and self.first_frame_s is not None:
+            print(f"Oturum #{self.runs}: ilk kare {self.first_frame_s * 1000:.0f} ms "
+                  f"(model yükleme {self.load_s:.2f} s, ısınma {self.warmup_s:.2f} s, menüde)")
+
+    def stop(self):
+        """Ask the running session to end after the current frame."""
+        self._stop.set()
+
+    def release_captures(self):
+        """Close held captures (e.g. before another window opens the camera)."""
+        for cap in (self._camera, self._video):
+            if cap is not None:
+                cap.release()
+        self._camera = self._video = None
+        self._camera_index = self._video_path = None
+
+    def close(self):
+        self.stop()
+        self.release_captures()
+        if self._thread is not None:
+            self._thread.join()
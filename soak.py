@@ -0,0 +1,197 @@
+"""
+Long-running soak test for the detection loop.
+
+Drives run_detection headlessly on synthetic (or looped video) frames with
+a stub detector, samples memory, allocations, thread count and per-frame
+latency at intervals, and fails if memory or latency grow faster than the
+configured slopes.
+
+Slopes are fitted after the warm-up, which by default is the first half of
+the run: caches that fill up once (SQLite pages, the event writer, sprite
+caches) take minutes to level off, and a fit across that growth reports a
+bounded warm-up as a leak. A real leak keeps growing in the second half.
+A check fails only when the slope exceeds its limit by more than twice
+its standard error. Noise from other load on the host then cannot fail a
+short run, while the error of a long run shrinks enough to catch a slow
+leak.
+
+    python soak.py --hours 10 --sample-every 60
+    python soak.py --minutes 5 --video kayit.mp4 --tracemalloc
+"""
+import argparse
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from config import load_user_settings
+from detector import run_detection
+from synthetic import LoopingCapture, StubModel, SyntheticCapture, random_traffic
+
+
+def current_rss_mb():
+    """Resident set size in MB, or None if it cannot be read on this platform."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def slope_per_hour(samples):
+    """
+    Least-squares slope of (t_seconds, value) samples and its standard
+    error, both in units per hour.
+    """
+    pts = [(t, v) for t, v in samples if v is not None]
+    if len(pts) < 2:
+        return 0.0, 0.0
+    n = len(pts)
+    mt = sum(t for t, _ in pts) / n
+    mv = sum(v for _, v in pts) / n
+    var = sum((t - mt) ** 2 for t, _ in pts)
+    if var == 0:
+        return 0.0, 0.0
+    slope = sum((t - mt) * (v - mv) for t, v in pts) / var
+    if n < 3:
+        return slope * 3600, 0.0
+    residual = sum((v - mv - slope * (t - mt)) ** 2 for t, v in pts) / (n - 2)
+    return slope * 3600, math.sqrt(residual / var) * 3600
+
+
+class SoakMonitor:
+    """on_frame callback for run_detection that samples resource usage."""
+
+    def __init__(self, duration_s, sample_every_s, warmup_s, use_tracemalloc, top_n=5):
+        self.duration_s = duration_s
+        self.sample_every_s = sample_every_s
+        self.warmup_s = warmup_s
+        self.use_tracemalloc = use_tracemalloc
+        self.top_n = top_n
+
+        self.start = None
+        self.next_sample = 0.0
+        self.frames = 0
+        self.window_latencies = []
+        self.samples = []  # (t, rss_mb, p50_ms, p99_ms, threads, frames)
+        self.base_snapshot = None
+
+    def __call__(self, frame_count, latency_s):
+        now = time.perf_counter()
+        if self.start is None:
+            self.start = now
+            self.next_sample = self.sample_every_s
+        self.frames = frame_count
+        self.window_latencies.append(latency_s * 1000)
+
+        elapsed = now - self.start
+        if elapsed >= self.next_sample:
+            self.next_sample += self.sample_every_s
+            self.sample(elapsed)
+        return elapsed < self.duration_s
+
+    def sample(self, elapsed):
+        lat = sorted(self.window_latencies)
+        self.window_latencies = []
+        p50 = lat[len(lat) // 2] if lat else 0.0
+        p99 = lat[min(len(lat) - 1, int(len(lat) * 0.99))] if lat else 0.0
+        rss = current_rss_mb()
+        threads = threading.active_count()
+        self.samples.append((elapsed, rss, p50, p99, threads, self.frames))
+
+        rss_text = f"{rss:.1f} MB" if rss is not None else "n/a"
+        print(f"[SOAK] t={elapsed / 60:7.1f} dk  kare={self.frames:9d}  RSS={rss_text}  "
+              f"gecikme p50={p50:.2f} ms p99={p99:.2f} ms  thread={threads}")
+
+        if self.use_tracemalloc:
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ))
+            if self.base_snapshot is None:
+                self.base_snapshot = snapshot
+            else:
+                growth = sorted(snapshot.compare_to(self.base_snapshot, "lineno"), key=lambda st: -st.size_diff)
+                for stat in growth[:self.top_n]:
+                    print(f"        {stat}")
+
+    def steady_samples(self):
+        return [s for s in self.samples if s[0] >= self.warmup_s]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Detection loop soak test")
+    parser.add_argument("--hours", type=float, default=0.0)
+    parser.add_argument("--minutes", type=float, default=0.0)
+    parser.add_argument("--sample-every", type=float, default=60.0, help="sampling interval (s)")
+    parser.add_argument("--warmup", type=float, help="ignored for slopes (s), default half the run")
+    parser.add_argument("--video", help="loop this video instead of synthetic frames")
+    parser.add_argument("--objects", type=int, default=12, help="scripted objects in synthetic mode")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--max-rss-slope", type=float, default=5.0, help="MB per hour")
+    parser.add_argument("--max-latency-slope", type=float, default=1.0, help="p50 ms per hour")
+    parser.add_argument("--max-thread-growth", type=int, default=2)
+    parser.add_argument("--tracemalloc", action="store_true", help="report top allocation growth")
+    parser.add_argument("--with-audio", action="store_true", help="keep alarm playback enabled")
+    args = parser.parse_args(argv)
+
+    # Varsayılan 30 dk: SQLite sayfa önbelleği ilk ~10 dk'da dolar, eğim ikinci yarıda ölçülür
+    duration = args.hours * 3600 + args.minutes * 60 or 1800.0
+
+    settings = dict(load_user_settings())
+    settings.update({"enable_log": False, "enable_fbf": False, "stream_enabled": False,
+                     "event_store_path": os.path.join(tempfile.gettempdir(), "soak_events.db")})
+    if not args.with_audio:
+        settings["alarm_enabled"] = False
+
+    objects = random_traffic(args.objects, args.width, args.height)
+    if args.video:
+        cap = LoopingCapture(args.video)
+        model = StubModel(objects)
+    else:
+        cap = SyntheticCapture(args.width, args.height, objects=objects)
+        model = StubModel(objects, capture=cap)
+
+    if args.tracemalloc:
+        tracemalloc.start(10)
+
+    warmup = args.warmup if args.warmup is not None else duration / 2
+    monitor = SoakMonitor(duration, args.sample_every, warmup, args.tracemalloc)
+    threads_before = threading.active_count()
+    run_detection(mode="test", model=model, cap=cap, settings=settings, headless=True, on_frame=monitor)
+    if monitor.window_latencies:
+        monitor.sample(time.perf_counter() - monitor.start)
+
+    steady = monitor.steady_samples()
+    rss_slope, rss_err = slope_per_hour([(s[0], s[1]) for s in steady])
+    lat_slope, lat_err = slope_per_hour([(s[0], s[2]) for s in steady])
+    thread_growth = max((s[4] for s in steady), default=threads_before) - threads_before
+
+    print(f"[SOAK] {monitor.frames} kare, RSS eğimi {rss_slope:.2f} ± {rss_err:.2f} MB/saat, "
+          f"gecikme eğimi {lat_slope:.3f} ± {lat_err:.3f} ms/saat, thread artışı {thread_growth}")
+
+    # Eğim sınırı iki standart hatadan fazla aşarsa başarısız (kısa koşuda gürültü payı)
+    failures = []
+    if rss_slope - 2 * rss_err > args.max_rss_slope:
+        failures.append(f"RSS eğimi {rss_slope:.2f} ± {rss_err:.2f} > {args.max_rss_slope} MB/saat")
+    if lat_slope - 2 * lat_err > args.max_latency_slope:
+        failures.append(f"gecikme eğimi {lat_slope:.3f} ± {lat_err:.3f} > {args.max_latency_slope} ms/saat")
+    if thread_growth > args.max_thread_growth:
+        failures.append(f"thread artışı {thread_growth} > {args.max_thread_growth}")
+
+    for failure in failures:
+        print(f"[SOAK] BAŞARISIZ: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+import base64
+import hashlib
+import json
+import struct
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import cv2
+import numpy as np
+
+WS_MAGIC = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+BOUNDARY = "frame"
+
+INDEX_HTML = """<!doctype html>
+<html><head><meta charset="utf-8"><title>Tehlike Tespit Sistemi</title></head>
+<body style="background:#070029;color:#fff;font-family:sans-serif">
+<img src="/stream.mjpg" style="max-width:100%">
+<pre id="events"></pre>
+<script>
+const ws = new WebSocket(`ws://${location.host}/ws`);
+const el = document.getElementById("events");
+ws.onmessage = (m) => { el.textContent = m.data + "\\n" + el.textContent.slice(0, 4000); };
+</script>
+</body></html>
+"""
+
+
+class StreamServer:
+    """
+    Optional HTTP server publishing the annotated stream and danger events.
+
+    Endpoints:
+        /            minimal viewer page
+        /stream.mjpg annotated frames as multipart MJPEG
+        /events.json danger events as JSON (?since=<seq> for incremental polling)
+        /ws          danger events pushed over a WebSocket
+
+    The detection loop only copies the latest frame into a slot; a single
+    encoder thread resizes and JPEG-encodes it once, and every viewer is
+    served the same bytes. Viewers always get the newest frame, so slow
+    clients skip frames instead of blocking the detection loop.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8080, max_fps=10, max_width=640,
+                 jpeg_quality=70, event_history=200):
+        self.host = host
+        self.port = port
+        self.min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.max_width = max_width
+        self.jpeg_quality = jpeg_quality
+
+        self._slot = None
+        self._slot_ready = False
+        self._last_publish = 0.0
+        self._slot_lock = threading.Lock()
+        self._slot_event = threading.Event()
+
+        self._jpeg = None
+        self._jpeg_seq = 0
+        self._frame_cond = threading.Condition()
+
+        self._events = deque(maxlen=event_history)
+        self._event_seq = 0
+        self._event_cond = threading.Condition()
+
+        self._running = False
+        self._httpd = None
+        self._threads = []
+
+        self.frames_offered = 0
+        self.frames_encoded = 0
+        self.encode_ms = 0.0
+
+    # --- Detection loop side -------------------------------------------------
+
+    def publish_frame(self, frame):
+        """Offer a frame for streaming; returns immediately."""
+        self.frames_offered += 1
+        now = time.perf_counter()
+        if now - self._last_publish < self.min_interval:
+            return
+        self._last_publish = now
+
+        with self._slot_lock:
+            if self._slot is None or self._slot.shape != frame.shape:
+                self._slot = np.empty_like(frame)
+            np.copyto(self._slot, frame)
+            self._slot_ready = True
+        self._slot_event.set()
+
+    def publish_event(self, event):
+        """Append a JSON-serialisable danger event to the event feed."""
+        with self._event_cond:
+            self._event_seq += 1
+            self._events.append({"seq": self._event_seq, "time": time.time(), **event})
+            self._event_cond.notify_all()
+
+    # --- Lifecycle -----------------------------------------------------------
+
+    def start(self):
+        server = self
+
+        class Handler(_StreamHandler):
+            stream = server
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._httpd.daemon_threads = True
+        self._running = True
+        self._threads = [
+            threading.Thread(target=self._encode_loop, daemon=True),
+            threading.Thread(target=self._httpd.serve_forever, daemon=True),
+        ]
+        for t in self._threads:
+            t.start()
+        print(f"[STREAM] http://{self.host}:{self.port}/")
+
+    def stop(self):
+        self._running = False
+        self._slot_event.set()
+        with self._frame_cond:
+            self._frame_cond.notify_all()
+        with self._event_cond:
+            self._event_cond.notify_all()
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    # --- Encoder -------------------------------------------------------------
+
+    def _encode_loop(self):
+        work = None
+        scaled = None
+        while self._running:
+            self._slot_event.wait(0.5)
+            self._slot_event.clear()
+            # Swap buffers so the detection loop never waits on encoding
+            with self._slot_lock:
+                if not self._slot_ready:
+                    continue
+                self._slot_ready = False
+                work, self._slot = self._slot, work
+
+            t0 = time.perf_counter()
+            frame = work
+            h, w = frame.shape[:2]
+            if self.max_width and w > self.max_width:
+                size = (self.max_width, int(h * self.max_width / w))
+                if scaled is None or scaled.shape[:2] != (size[1], size[0]):
+                    scaled = np.empty((size[1], size[0], 3), dtype=np.uint8)
+                cv2.resize(frame, size, dst=scaled, interpolation=cv2.INTER_AREA)
+                frame = scaled
+            ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            if not ok:
+                continue
+            self.encode_ms = (time.perf_counter() - t0) * 1000
+            self.frames_encoded += 1
+            with self._frame_cond:
+                self._jpeg = buf.tobytes()
+                self._jpeg_seq += 1
+                self._frame_cond.notify_all()
+
+    # --- Viewer side ---------------------------------------------------------
+
+    def wait_frame(self, last_seq, timeout=1.0):
+        """Block until a frame newer than last_seq is encoded; returns (seq, jpeg)."""
+        with self._frame_cond:
+            self._frame_cond.wait_for(lambda: self._jpeg_seq > last_seq or not self._running, timeout)
+            return self._jpeg_seq, self._jpeg
+
+    def events_since(self, seq):
+        with self._event_cond:
+            return [e for e in self._events if e["seq"] > seq]
+
+    def wait_events(self, last_seq, timeout=1.0):
+        with self._event_cond:
+            self._event_cond.wait_for(lambda: self._event_seq > last_seq or not self._running, timeout)
+            return [e for e in self._events if e["seq"] > last_seq]
+
+    @property
+    def running(self):
+        return self._running
+
+
+class _StreamHandler(BaseHTTPRequestHandler):
+    stream = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/":
+            self._send_body(INDEX_HTML.encode("utf-8"), "text/html; charset=utf-8")
+        elif url.path == "/stream.mjpg":
+            self._serve_mjpeg()
+        elif url.path == "/events.json":
+            try:
+                since = int(parse_qs(url.query).get("since", ["0"])[0])
+            except ValueError:
+                self.send_error(400, "since must be an integer")
+                return
+            body = json.dumps(self.stream.events_since(since)).encode("utf-8")
+            self._send_body(body, "application/json")
+        elif url.path == "/ws" and self.headers.get("Upgrade", "").lower() == "websocket":
+            self._serve_websocket()
+        else:
+            self.send_error(404)
+
+    def _send_body(self, body, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _serve_mjpeg(self):
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        seq = 0
+        try:
+            while self.stream.running:
+                new_seq, jpeg = self.stream.wait_frame(seq)
+                if new_seq == seq or jpeg is None:
+                    continue
+                seq = new_seq
+                self.wfile.write(f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                                 f"Content-Length: {len(jpeg)}\r\n\r\n".encode("ascii"))
+                self.wfile.write(jpeg)
+                self.wfile.write(b"\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        self.close_connection = True
+
+    def _serve_websocket(self):
+        key = self.headers.get("Sec-WebSocket-Key", "")
+        accept = base64.b64encode(hashlib.sha1((key + WS_MAGIC).encode("ascii")).digest()).decode("ascii")
+        self.send_response(101, "Switching Protocols")
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept)
+        self.end_headers()
+        seq = self.stream._event_seq
+        try:
+            while self.stream.running:
+                events = self.stream.wait_events(seq)
+                for event in events:
+                    seq = event["seq"]
+                    self.wfile.write(_ws_text_frame(json.dumps(event)))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        self.close_connection = True
+
+
+def _ws_text_frame(text):
+    """Encode an unmasked server-to-client WebSocket text frame."""
+    payload = text.encode("utf-8")
+    n = len(payload)
+    if n < 126:
+        header = struct.pack("!BB", 0x81, n)
+    elif n < 1 << 16:
+        header = struct.pack("!BBH", 0x81, 126, n)
+    else:
+        header = struct.pack("!BBQ", 0x81, 127, n)
+    return header + payload
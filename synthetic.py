@@ -0,0 +1,289 @@
+import random
+import time
+
+import cv2
+import numpy as np
+
+# COCO ids of the classes the scripted scenarios use
+STUB_NAMES = {0: "person", 1: "bicycle", 2: "car", 3: "motorcycle", 5: "bus", 7: "truck", 16: "dog"}
+_NAME_TO_CLS = {name: cls for cls, name in STUB_NAMES.items()}
+
+
+class ScriptedObject:
+    """
+    Object moving on a scripted linear trajectory.
+
+    The box appears at `start_box` on `start_frame`, stays put for
+    `hold_frames` and then moves by `velocity` (dx, dy per frame), growing by
+    `growth` pixels per frame on each side, stopping after `move_frames`.
+    With `period` set the trajectory restarts every `period` frames under a
+    new track id, which keeps track creation/removal going in long runs.
+    """
+
+    def __init__(self, obj_id, cls_name, start_box, velocity, start_frame=0, end_frame=None,
+                 growth=0.0, jitter=0.0, period=None, hold_frames=0, move_frames=None, seed=0):
+        self.id = obj_id
+        self.cls_name = cls_name
+        self.cls = _NAME_TO_CLS[cls_name]
+        self.start_box = start_box
+        self.velocity = velocity
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.growth = growth
+        self.jitter = jitter
+        self.period = period
+        self.hold_frames = hold_frames
+        self.move_frames = move_frames
+        self._rng = random.Random(seed)
+
+    def observe(self, frame_no):
+        """Return (track_id, box) at frame_no, or None if not visible."""
+        if frame_no < self.start_frame or (self.end_frame is not None and frame_no >= self.end_frame):
+            return None
+        t = frame_no - self.start_frame
+        track_id = self.id
+        if self.period:
+            track_id = self.id + (t // self.period) * 1000
+            t %= self.period
+        box = self.box_at(t)
+        if self.jitter:
+            box = tuple(c + self._rng.gauss(0, self.jitter) for c in box)
+        return track_id, box
+
+    def box_at(self, t):
+        """Noise-free box t frames after the object appears."""
+        t = max(0, t - self.hold_frames)
+        if self.move_frames is not None:
+            t = min(t, self.move_frames)
+        x1, y1, x2, y2 = self.start_box
+        dx, dy = self.velocity
+        g = self.growth * t
+        return x1 + dx * t - g, y1 + dy * t - g, x2 + dx * t + g, y2 + dy * t + g
+
+
+class StubBox:
+    __slots__ = ("cls", "id", "conf", "xyxy")
+
+    def __init__(self, cls, track_id, box, conf=0.9):
+        self.cls = [cls]
+        self.id = [track_id] if track_id is not None else None
+        self.conf = [conf]
+        self.xyxy = [box]
+
+
+class StubResults:
+    __slots__ = ("boxes", "names")
+
+    def __init__(self, boxes, names):
+        self.boxes = boxes
+        self.names = names
+
+
+class StubModel:
+    """
+    Stand-in for the YOLO model that reports scripted objects.
+
+    Mirrors the parts of the Ultralytics API run_detection uses (`names`,
+    `track()`, `predict()` and the result boxes' cls/id/xyxy). When bound to
+    a SyntheticCapture it reports the objects of the frame that was last
+    read, so frames skipped with grab() stay in sync. `latency_s` simulates
+    inference time per call.
+    """
+
+    def __init__(self, objects=(), capture=None, miss_rate=0.0, latency_s=0.0, seed=0):
+        self.names = STUB_NAMES
+        self.objects = list(objects)
+        self.capture = capture
+        self.miss_rate = miss_rate
+        self.latency_s = latency_s
+        self.calls = 0
+        self._rng = random.Random(seed)
+
+    def _frame_no(self):
+        if self.capture is not None:
+            return self.capture.frame_no - 1
+        return self.calls - 1
+
+    def _boxes(self, with_ids):
+        self.calls += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        frame_no = self._frame_no()
+        boxes = []
+        for obj in self.objects:
+            seen = obj.observe(frame_no)
+            if seen is None or (self.miss_rate and self._rng.random() < self.miss_rate):
+                continue
+            track_id, box = seen
+            boxes.append(StubBox(obj.cls, track_id if with_ids else None, box))
+        return [StubResults(boxes, self.names)]
+
+    def track(self, frame, persist=True, **kwargs):
+        return self._boxes(with_ids=True)
+
+    def predict(self, frame, **kwargs):
+        return self._boxes(with_ids=False)
+
+    def __call__(self, frame, **kwargs):
+        return self.predict(frame, **kwargs)
+
+
+class BlobModel:
+    """
+    Stand-in detector that finds the filled rectangles SyntheticCapture
+    draws in whatever image it is given, so resizing and tiling paths see
+    coordinates of the actual input. Accepts a single image or a list
+    (batched call) like the Ultralytics predict API.
+    """
+
+    def __init__(self, cls=0, min_area=16, latency_s=0.0):
+        self.names = STUB_NAMES
+        self.cls = cls
+        self.min_area = min_area
+        self.latency_s = latency_s
+        self.calls = 0
+        self.images = 0
+
+    def _detect(self, image):
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        _, mask = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        boxes = []
+        for c in contours:
+            x, y, w, h = cv2.boundingRect(c)
+            if w * h >= self.min_area:
+                boxes.append(StubBox(self.cls, None, (x, y, x + w, y + h)))
+        return StubResults(boxes, self.names)
+
+    def predict(self, source, **kwargs):
+        self.calls += 1
+        images = source if isinstance(source, list) else [source]
+        self.images += len(images)
+        if self.latency_s:
+            time.sleep(self.latency_s * len(images))
+        return [self._detect(image) for image in images]
+
+    def __call__(self, source, **kwargs):
+        return self.predict(source, **kwargs)
+
+
+class SyntheticCapture:
+    """
+    cv2.VideoCapture look-alike producing generated frames.
+
+    Scripted objects are drawn as filled rectangles on a static background,
+    so pixel-based stages (motion gating, rendering) see realistic change.
+    frame_count=None produces frames forever.
+    """
+
+    def __init__(self, width=1280, height=720, frame_count=None, objects=(), fps=30.0):
+        self.width = width
+        self.height = height
+        self.frame_count = frame_count
+        self.objects = list(objects)
+        self.fps = fps
+        self.frame_no = 0
+        self._opened = True
+
+        ys = np.linspace(40, 120, height, dtype=np.uint8)[:, None]
+        self._background = np.repeat(np.repeat(ys, width, axis=1)[:, :, None], 3, axis=2)
+        self._frame = np.empty_like(self._background)
+
+    def isOpened(self):
+        return self._opened
+
+    def grab(self):
+        if not self._opened or (self.frame_count is not None and self.frame_no >= self.frame_count):
+            return False
+        self.frame_no += 1
+        return True
+
+    def retrieve(self, image=None):
+        out = image if image is not None and image.shape == self._frame.shape else self._frame
+        np.copyto(out, self._background)
+        for obj in self.objects:
+            seen = obj.observe(self.frame_no - 1)
+            if seen is not None:
+                x1, y1, x2, y2 = (int(c) for c in seen[1])
+                cv2.rectangle(out, (x1, y1), (x2, y2), (200, 200, 200), -1)
+        return True, out
+
+    def read(self, image=None):
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.frame_no)
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.frame_count or 0)
+        return 0.0
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            self.frame_no = int(value)
+            return True
+        return False
+
+    def release(self):
+        self._opened = False
+
+
+class LoopingCapture:
+    """Wraps a video file and restarts it at the end, for long soak runs."""
+
+    def __init__(self, path):
+        self.path = path
+        self.loops = 0
+        self._cap = cv2.VideoCapture(path)
+
+    def _rewind(self):
+        self.loops += 1
+        self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def grab(self):
+        if self._cap.grab():
+            return True
+        self._rewind()
+        return self._cap.grab()
+
+    def read(self, image=None):
+        ret, frame = self._cap.read(image) if image is not None else self._cap.read()
+        if not ret:
+            self._rewind()
+            ret, frame = self._cap.read(image) if image is not None else self._cap.read()
+        return ret, frame
+
+    def get(self, prop):
+        return self._cap.get(prop)
+
+    def set(self, prop, value):
+        return self._cap.set(prop, value)
+
+    def isOpened(self):
+        return self._cap.isOpened()
+
+    def release(self):
+        self._cap.release()
+
+
+def random_traffic(n_objects, width=1280, height=720, period=300, seed=0):
+    """Objects crossing the frame in random directions, respawning every `period` frames."""
+    rng = random.Random(seed)
+    classes = [name for name in STUB_NAMES.values()]
+    objects = []
+    for i in range(n_objects):
+        w, h = rng.uniform(40, 200), rng.uniform(40, 200)
+        x, y = rng.uniform(0, width - w), rng.uniform(0, height - h)
+        v = (rng.uniform(-6, 6), rng.uniform(-6, 6))
+        objects.append(ScriptedObject(i + 1, rng.choice(classes), (x, y, x + w, y + h), v,
+                                      start_frame=rng.randrange(period), growth=rng.uniform(0, 0.3),
+                                      jitter=1.5, period=period, seed=seed + i))
+    return objects
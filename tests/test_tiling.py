@@ -0,0 +1,27 @@
+from synthetic import BlobModel, ScriptedObject, SyntheticCapture
+from tiling import TiledDetector, merge_detections
+
+
+def test_nested_objects_from_one_tile_are_kept():
+    # Yetişkinin önündeki çocuk: aynı sınıf, büyük kutunun içinde
+    assert sorted(merge_detections([(100, 100, 200, 400), (110, 250, 170, 390)], [0.9, 0.95], [0, 0])) == [0, 1]
+    keep = merge_detections([(100, 100, 200, 400), (110, 250, 170, 390)], [0.9, 0.95], [0, 0],
+                            sources=[3, 3], cut=[False, False])
+    assert sorted(keep) == [0, 1]
+
+
+def test_seam_fragment_inside_other_tile_box_is_dropped():
+    boxes = [(1800, 1300, 2300, 1700), (1800, 1300, 2176, 1664)]
+    assert merge_detections(boxes, [0.8, 0.9], [2, 2], sources=[-1, 5], cut=[False, True]) == [0]
+    # Kesik olmayan iç kutu kalır
+    assert sorted(merge_detections(boxes, [0.8, 0.9], [2, 2], sources=[-1, 5], cut=[False, False],
+                                   iou_threshold=0.9)) == [0, 1]
+
+
+def test_tiled_detect_merges_object_cut_by_tiles():
+    objects = [ScriptedObject(1, "person", (600, 1000, 640, 1080), (0, 0)),
+               ScriptedObject(2, "car", (1800, 1300, 2300, 1700), (0, 0))]
+    ret, frame = SyntheticCapture(3840, 2160, frame_count=1, objects=objects).read()
+    detector = TiledDetector(BlobModel())
+    boxes = sorted(tuple(round(c / 10) for c in box) for _, _, box in detector.detect(frame))
+    assert boxes == [(60, 100, 64, 108), (180, 130, 230, 170)]
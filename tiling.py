@@ -0,0 +1,263 @@
+import time
+
+import cv2
+import numpy as np
+
+from iou_tracker import iou_matrix
+
+
+def make_tiles(width, height, tile_size=640, overlap=0.2):
+    """Overlapping (x1, y1, x2, y2) tiles covering the frame, all tile_size wide where possible."""
+    step = max(1, int(tile_size * (1 - overlap)))
+
+    def starts(length):
+        if length <= tile_size:
+            return [0]
+        out = list(range(0, length - tile_size, step))
+        out.append(length - tile_size)
+        return out
+
+    return [(x, y, min(x + tile_size, width), min(y + tile_size, height))
+            for y in starts(height) for x in starts(width)]
+
+
+def merge_detections(boxes, scores, classes, iou_threshold=0.5, containment=0.8, sources=None, cut=None):
+    """
+    Class-aware merge of detections from overlapping tiles.
+
+    Greedy IoU NMS by score. When `sources` (tile index per box, -1 for
+    the global pass) and `cut` (box touches an inner seam of its tile) are
+    given, a cut box lying mostly (`containment` of its area) inside a
+    larger same-class box from another source is dropped first, whatever
+    its score: that is the partial box an object cut by a tile edge leaves
+    behind. Nested objects seen by one tile (a child in front of an adult)
+    are left to NMS. Returns the indices to keep.
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    if not len(boxes):
+        return []
+    scores = np.asarray(scores, dtype=np.float64)
+    classes = np.asarray(classes)
+    same = classes[:, None] == classes[None, :]
+
+    removed = np.zeros(len(boxes), dtype=bool)
+    if sources is not None and cut is not None:
+        sources = np.asarray(sources)
+        cut = np.asarray(cut, dtype=bool)
+        x1 = np.maximum(boxes[:, None, 0], boxes[None, :, 0])
+        y1 = np.maximum(boxes[:, None, 1], boxes[None, :, 1])
+        x2 = np.minimum(boxes[:, None, 2], boxes[None, :, 2])
+        y2 = np.minimum(boxes[:, None, 3], boxes[None, :, 3])
+        inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+        area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+        # inside[i, j]: box j is a seam fragment lying inside the larger box i of another tile
+        inside = ((inter / np.maximum(area[None, :], 1e-9) > containment) & same & cut[None, :]
+                  & (sources[:, None] != sources[None, :]) & (area[:, None] > area[None, :]))
+        for i in np.argsort(-area, kind="stable"):
+            if not removed[i]:
+                removed |= inside[i]
+
+    suppress = (iou_matrix(boxes, boxes) > iou_threshold) & same
+    keep = []
+    for i in np.argsort(-scores, kind="stable"):
+        if removed[i]:
+            continue
+        keep.append(int(i))
+        removed |= suppress[i]
+    return keep
+
+
+class TiledDetector:
+    """
+    Detection on a full-resolution frame through overlapping tiles.
+
+    Tiles touching a crash zone (grown by `zone_margin` of the frame) run
+    every frame. Other tiles run only if they had detections within
+    `recent_frames`, changed since they last ran (mean grayscale
+    difference above `change_threshold`), or have been skipped for
+    `max_skip` frames; tiles touching the vehicle zone go first when
+    `max_batch` limits the batch. With `global_pass` the whole frame is
+    added to the batch at tile size, which keeps large, close objects that
+    span several tiles whole. All selected tiles go through one batched
+    predict call and are merged with cross-tile NMS.
+    """
+
+    THUMB_SCALE = 16
+    SEAM_MARGIN = 2
+
+    def __init__(self, model, tile_size=640, overlap=0.2, nms_iou=0.5, recent_frames=15, max_skip=30,
+                 change_threshold=6.0, zone_margin=0.15, global_pass=True, max_batch=0):
+        self.model = model
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.nms_iou = nms_iou
+        self.recent_frames = recent_frames
+        self.max_skip = max_skip
+        self.change_threshold = change_threshold
+        self.zone_margin = zone_margin
+        self.global_pass = global_pass
+        self.max_batch = max_batch
+
+        self.tiles = None
+        self._shape = None
+        self._zones = ((), ())
+        self._tier = None
+        self._last_run = None
+        self._last_hit = None
+        self._refs = None
+        self._small = None
+        self._thumb = None
+        self._global = None
+        self._frame_no = 0
+
+        self.frames = 0
+        self.tiles_run = 0
+        self.tiles_skipped = 0
+        self.total_ms = 0.0
+        self.infer_ms = 0.0
+        self.last = {"tiles": 0, "run": 0, "skipped": 0, "ms": 0.0}
+
+    def set_zones(self, crash_zones, vehicle_box=None):
+        """Zone boxes in full-resolution coordinates; tile priorities are recomputed."""
+        self._zones = (list(crash_zones), [vehicle_box] if vehicle_box is not None else [])
+        self._tier = None
+
+    def _layout(self, shape):
+        h, w = shape[:2]
+        self._shape = shape[:2]
+        self.tiles = make_tiles(w, h, self.tile_size, self.overlap)
+        n = len(self.tiles)
+        self._last_run = np.full(n, -10 ** 9)
+        self._last_hit = np.full(n, -10 ** 9)
+        self._refs = [None] * n
+        self._tier = None
+        tw, th = max(1, w // self.THUMB_SCALE), max(1, h // self.THUMB_SCALE)
+        self._small = np.empty((th, tw) + shape[2:], dtype=np.uint8)
+        self._thumb = np.empty((th, tw), dtype=np.uint8)
+        scale = min(1.0, self.tile_size / max(w, h))
+        self._global = np.empty((int(h * scale), int(w * scale)) + shape[2:], dtype=np.uint8) if scale < 1.0 else None
+
+    def _tiers(self):
+        h, w = self._shape
+        mx, my = self.zone_margin * w, self.zone_margin * h
+        crash, vehicle = self._zones
+        tiers = []
+        for tx1, ty1, tx2, ty2 in self.tiles:
+            def near(box, gx=0.0, gy=0.0):
+                return tx1 <= box[2] + gx and box[0] - gx <= tx2 and ty1 <= box[3] + gy and box[1] - gy <= ty2
+            if any(near(z, mx, my) for z in crash):
+                tiers.append(0)
+            elif any(near(z) for z in vehicle):
+                tiers.append(1)
+            else:
+                tiers.append(2)
+        return np.array(tiers)
+
+    def _changed(self, i):
+        x1, y1, x2, y2 = (c // self.THUMB_SCALE for c in self.tiles[i])
+        patch = self._thumb[y1:max(y2, y1 + 1), x1:max(x2, x1 + 1)]
+        ref = self._refs[i]
+        return ref is None or ref.shape != patch.shape or float(cv2.absdiff(patch, ref).mean()) > self.change_threshold
+
+    def select(self, frame):
+        """Indices of the tiles to run on this frame, most important first."""
+        if self._shape != frame.shape[:2]:
+            self._layout(frame.shape)
+        if self._tier is None:
+            self._tier = self._tiers()
+        th, tw = self._thumb.shape
+        cv2.resize(frame, (tw, th), dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._thumb)
+
+        n = self._frame_no
+        candidates = []
+        for i in range(len(self.tiles)):
+            tier = int(self._tier[i])
+            stale = n - self._last_run[i] >= self.max_skip
+            recent = n - self._last_hit[i] <= self.recent_frames
+            if tier == 0 or stale or recent or self._changed(i):
+                # Önce bölge karoları, sonra en uzun süredir çalışmayanlar
+                candidates.append((tier, self._last_run[i], i))
+        candidates.sort()
+        selected = [i for _, _, i in candidates]
+        if self.max_batch:
+            selected = selected[:self.max_batch]
+        return selected
+
+    def detect(self, frame, imgsz=None):
+        """
+        Run the tiled detector on a full-resolution frame.
+
+        Returns:
+            List of (cls, conf, (x1, y1, x2, y2)) in frame coordinates.
+        """
+        t0 = time.perf_counter()
+        self._frame_no += 1
+        selected = self.select(frame)
+
+        batch = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in (self.tiles[i] for i in selected)]
+        offsets = [self.tiles[i][:2] for i in selected]
+        scale = 1.0
+        if self.global_pass:
+            if self._global is not None:
+                gh, gw = self._global.shape[:2]
+                scale = gw / self._shape[1]
+                batch.append(cv2.resize(frame, (gw, gh), dst=self._global))
+            else:
+                batch.append(frame)
+            offsets.append((0, 0))
+
+        t_infer = time.perf_counter()
+        results = self.model.predict(batch, imgsz=imgsz or self.tile_size, verbose=False) if batch else []
+        self.infer_ms += (time.perf_counter() - t_infer) * 1000
+
+        boxes, scores, classes, sources, cut = [], [], [], [], []
+        h, w = self._shape
+        m = self.SEAM_MARGIN
+        for k, (result, (ox, oy)) in enumerate(zip(results, offsets)):
+            is_global = self.global_pass and k == len(results) - 1
+            s = 1.0 / scale if is_global else 1.0
+            tx1, ty1, tx2, ty2 = (0, 0, w, h) if is_global else self.tiles[selected[k]]
+            for box in result.boxes:
+                x1, y1, x2, y2 = (float(c) for c in box.xyxy[0])
+                x1, y1, x2, y2 = x1 * s + ox, y1 * s + oy, x2 * s + ox, y2 * s + oy
+                boxes.append((x1, y1, x2, y2))
+                scores.append(float(box.conf[0]) if box.conf is not None else 1.0)
+                classes.append(int(box.cls[0]))
+                sources.append(-1 if is_global else selected[k])
+                # Karo kenarı kare kenarı değilse orada kesilmiş olabilir
+                cut.append((tx1 > 0 and x1 <= tx1 + m) or (ty1 > 0 and y1 <= ty1 + m)
+                           or (tx2 < w and x2 >= tx2 - m) or (ty2 < h and y2 >= ty2 - m))
+            if not is_global:
+                i = selected[k]
+                self._last_run[i] = self._frame_no
+                if len(result.boxes):
+                    self._last_hit[i] = self._frame_no
+                x1, y1, x2, y2 = (c // self.THUMB_SCALE for c in self.tiles[i])
+                patch = self._thumb[y1:max(y2, y1 + 1), x1:max(x2, x1 + 1)]
+                if self._refs[i] is None or self._refs[i].shape != patch.shape:
+                    self._refs[i] = patch.copy()
+                else:
+                    np.copyto(self._refs[i], patch)
+
+        keep = merge_detections(boxes, scores, classes, self.nms_iou, sources=sources, cut=cut)
+        out = [(classes[i], scores[i], boxes[i]) for i in keep]
+
+        ms = (time.perf_counter() - t0) * 1000
+        self.frames += 1
+        self.tiles_run += len(selected)
+        self.tiles_skipped += len(self.tiles) - len(selected)
+        self.total_ms += ms
+        self.last = {"tiles": len(self.tiles), "run": len(selected), "skipped": len(self.tiles) - len(selected),
+                     "ms": ms}
+        return out
+
+    def stats(self):
+        n = self.frames or 1
+        return {
+            "tiles": len(self.tiles or ()),
+            "avg_run": self.tiles_run / n,
+            "avg_skipped": self.tiles_skipped / n,
+            "ms_per_frame": self.total_ms / n,
+            "infer_ms_per_frame": self.infer_ms / n,
+        }
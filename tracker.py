@@ -2,7 +2,7 @@ from collections import deque
 
 
 class TrackedObject:
-    def __init__(self, obj_id, cls_name, history_length=150):
+    def __init__(self, obj_id, cls_name, history_length=150, kalman=None):
         """
         Initialize tracked object with 150 frame cap by default.
 
@@ -10,11 +10,15 @@ class TrackedObject:
             obj_id: unique object identifier
             cls_name: object class name (car, person, etc.)
             history_length: maximum number of frames to store (default 150)
+            kalman: shared BoxKalmanBank, if the session filters box motion
         """
         self.id = obj_id
         self.cls_name = cls_name
         # Cap history at 150 frames max for memory efficiency
         self.boxes = deque(maxlen=min(history_length, 150))
+        # Filtered edge velocity (dx1, dy1, dx2, dy2), set when a Kalman bank is used
+        self.velocity = None
+        self.kalman = kalman
 
     def add(self, box):
         """Add new bounding box to history"""
@@ -35,7 +39,14 @@ class TrackedObject:
 
         Returns:
             List of (dx, dy) tuples for each corner [TL, TR, BL, BR]
+
+        If a filtered velocity is set it is used directly instead of the
+        mean of frame-to-frame deltas.
         """
+        if self.velocity is not None:
+            dx1, dy1, dx2, dy2 = self.velocity
+            return [(dx1, dy1), (dx2, dy1), (dx1, dy2), (dx2, dy2)]
+
         boxes = self.get_last_n_boxes(n)
         if len(boxes) < 2:
             return [(0.0, 0.0)] * 4
@@ -79,6 +90,26 @@ class TrackedObject:
 
         return vectors
 
+    def current_box(self):
+        """Filtered box while the Kalman bank tracks this object, else the last detected box."""
+        if self.kalman is not None and self.id in self.kalman:
+            return self.kalman.box(self.id)
+        return self.boxes[-1]
+
+    def predict_box(self, frames, n=None):
+        """
+        Box `frames` frames ahead.
+
+        Uses the Kalman bank's filtered position and velocity while it tracks
+        this object; otherwise the last box is moved by the corner motion
+        vectors over the last n frames.
+        """
+        if self.kalman is not None and self.id in self.kalman:
+            return self.kalman.predict_box(self.id, frames)
+        (dx1, dy1), _, _, (dx2, dy2) = self.get_corner_motion_vectors(n or len(self.boxes))
+        x1, y1, x2, y2 = self.boxes[-1]
+        return x1 + dx1 * frames, y1 + dy1 * frames, x2 + dx2 * frames, y2 + dy2 * frames
+
     def get_total_frames(self):
         """Get total number of frames stored"""
         return len(self.boxes)
@@ -110,4 +141,74 @@ class TrackedObject:
             movement = (dx * dx + dy * dy) ** 0.5
             total_movement += movement
 
-        return total_movement
\ No newline at end of file
+        return total_movement
+
+class TrackingState:
+    """
+    Per-session track histories plus the optional Kalman bank.
+
+    Everything run_detection needs to carry from one frame to the next on
+    the tracking side lives here, so review mode can deep-copy it as a
+    checkpoint and replay cached detections from there.
+    """
+
+    def __init__(self, history_length, kalman=None):
+        self.history_length = history_length
+        self.kalman = kalman
+        self.objects = {}
+        self._seen = []
+
+    def update(self, detections, names):
+        """
+        Add one frame of (obj_id, cls, box) detections.
+
+        Returns:
+            (frame_objects, lost_ids): the TrackedObjects seen this frame and
+            the ids whose tracks ended (call remove() for those).
+        """
+        frame_objects = []
+        for obj_id, cls, box in detections:
+            if obj_id is None:
+                continue
+            obj = self.objects.get(obj_id)
+            if obj is None:
+                obj = TrackedObject(obj_id, names[cls], self.history_length, self.kalman)
+                self.objects[obj_id] = obj
+            obj.add(box)
+            frame_objects.append(obj)
+        self._seen = [obj.id for obj in frame_objects]
+
+        # Tüm izler için tek seferde Kalman tahmini/güncellemesi
+        if self.kalman is not None:
+            lost_ids = self.kalman.step({obj.id: obj.boxes[-1] for obj in frame_objects})
+            for obj in frame_objects:
+                obj.velocity = self.kalman.velocity(obj.id)
+        else:
+            current_ids = {obj.id for obj in frame_objects}
+            lost_ids = [oid for oid in self.objects if oid not in current_ids]
+        return frame_objects, lost_ids
+
+    def predict(self):
+        """
+        Advance the tracks seen on the last detector frame by their motion
+        model only, for frames where the detector was skipped. The predicted
+        box is added to the history so velocities keep their value instead
+        of being pulled towards zero by repeated stale boxes.
+
+        Returns:
+            (frame_objects, lost_ids) like update(); lost_ids is always empty.
+        """
+        frame_objects = [self.objects[oid] for oid in self._seen if oid in self.objects]
+        if self.kalman is not None:
+            self.kalman.predict()
+            for obj in frame_objects:
+                if obj.id in self.kalman:
+                    obj.add(tuple(int(round(c)) for c in self.kalman.box(obj.id)))
+                    obj.velocity = self.kalman.velocity(obj.id)
+        else:
+            for obj in frame_objects:
+                obj.add(tuple(int(round(c)) for c in obj.predict_box(1)))
+        return frame_objects, []
+
+    def remove(self, obj_id):
+        return self.objects.pop(obj_id, None)
@@ -1,5 +1,5 @@
 import FreeSimpleGUI as sg
-from detector import run_detection
+from session import DetectionSession
 from ui_settings import launch_settings_window
 
 def launch_menu():
@@ -38,6 +38,17 @@ def launch_menu():
 
     window = sg.Window('Ana Menü', layout, size=(1280, 720), element_justification='center')
 
+    # Model menü açıkken arka planda yüklenir ve ısıtılır; oturumlar arasında tutulur
+    session = DetectionSession()
+    session.warm_up()
+
+    def run_session(**kwargs):
+        # Model yüklenemezse menü açık kalır, hata gösterilir
+        try:
+            session.run(**kwargs)
+        except Exception as e:
+            sg.popup_error(f"Tespit başlatılamadı:\n{e}")
+
     def get_start_frame():
         layout = [
             [sg.Text("Başlangıç karesi:", font=('Segoe UI', 16))],
@@ -65,21 +76,25 @@ def launch_menu():
         if event in (sg.WIN_CLOSED, 'Çıkış'):
             break
         elif event == 'Başlat':
-            window.close()
-            run_detection(mode="live")
-            launch_menu()
+            window.hide()
+            run_session(mode="live")
+            window.un_hide()
         elif event == 'Test Modu':
             video_path = sg.popup_get_file("Bir video seçin", file_types=(("MP4 files", "*.mp4"),))
             if video_path:
                 start_frame = get_start_frame()
                 if start_frame is not None:
-                    window.close()
-                    run_detection(mode="test", video_path=video_path, start_frame=start_frame)
-                    launch_menu()
+                    window.hide()
+                    run_session(mode="test", video_path=video_path, start_frame=start_frame)
+                    window.un_hide()
         elif event == 'Ayarlar':
-            window.close()
+            window.hide()
+            # Bölge kalibrasyonu kamerayı kendisi açar
+            session.release_captures()
             launch_settings_window()
-            launch_menu()
-            return
+            # Model yolu değiştiyse yeni model arka planda yüklenir
+            session.warm_up()
+            window.un_hide()
 
+    session.close()
     window.close()
@@ -0,0 +1,57 @@
+from geometry import boxes_overlap
+
+
+class Zone:
+    __slots__ = ("name", "severity", "box")
+
+    def __init__(self, name, severity, box):
+        self.name = name
+        self.severity = severity
+        self.box = box
+
+
+class ZoneGrid:
+    """
+    Uniform grid over the frame mapping cells to the zones that cover them.
+
+    Built once per calibration; `query` returns candidate zones for a box
+    by looking at the cells it touches, then confirms with an exact AABB
+    overlap test. Zones are returned most severe first.
+    """
+
+    def __init__(self, zones, frame_w, frame_h, cell_size=64):
+        self.zones = sorted((Zone(*z) for z in zones), key=lambda z: -z.severity)
+        self.frame_w = frame_w
+        self.frame_h = frame_h
+        self.cell_size = max(1, int(cell_size))
+        self.cols = (frame_w + self.cell_size - 1) // self.cell_size
+        self.rows = (frame_h + self.cell_size - 1) // self.cell_size
+
+        self._cells = {}
+        for i, zone in enumerate(self.zones):
+            c1, r1, c2, r2 = self._cell_range(zone.box)
+            for r in range(r1, r2 + 1):
+                for c in range(c1, c2 + 1):
+                    self._cells.setdefault((c, r), []).append(i)
+
+    def _cell_range(self, box):
+        x1, y1, x2, y2 = box
+        cs = self.cell_size
+        c1 = min(max(int(min(x1, x2) // cs), 0), self.cols - 1)
+        c2 = min(max(int(max(x1, x2) // cs), 0), self.cols - 1)
+        r1 = min(max(int(min(y1, y2) // cs), 0), self.rows - 1)
+        r2 = min(max(int(max(y1, y2) // cs), 0), self.rows - 1)
+        return c1, r1, c2, r2
+
+    def query(self, box):
+        """Return zones overlapping box, most severe first."""
+        x1, y1, x2, y2 = box
+        # Entirely off-frame boxes cannot reach a zone inside the frame
+        if x2 < 0 or y2 < 0 or x1 > self.frame_w or y1 > self.frame_h:
+            return []
+        c1, r1, c2, r2 = self._cell_range(box)
+        hits = set()
+        for r in range(r1, r2 + 1):
+            for c in range(c1, c2 + 1):
+                hits.update(self._cells.get((c, r), ()))
+        return [self.zones[i] for i in sorted(hits) if boxes_overlap(box, self.zones[i].box)]